@@ -3,6 +3,11 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with a single uvicorn worker (the WebSocket lab's rooms live in the
+process) and XSS_ASYNC_VIEWS on, so the I/O-bound labs use their async views:
+
+    uvicorn core.asgi:application --app-dir src
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +18,18 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up: the WebSocket backend reads settings.
+from labs.xss.websocket import WEBSOCKET_PATH, websocket_application
+
+
+async def application(scope, receive, send):
+    """Serve the XSS lab's WebSocket endpoint and hand everything else to Django."""
+    if scope["type"] == "websocket":
+        if scope["path"] == WEBSOCKET_PATH:
+            return await websocket_application(scope, receive, send)
+        # Django itself has no WebSocket support: refuse the handshake.
+        await receive()
+        return await send({"type": "websocket.close"})
+    return await django_application(scope, receive, send)
@@ -0,0 +1,103 @@
+"""
+File responses with strong validators and byte ranges.
+
+``file_response`` streams a file from an open handle with FileResponse, so
+WSGI servers that support ``wsgi.file_wrapper`` send it with sendfile()
+instead of copying it through Python. Clients revalidating with
+If-None-Match get a 304, and a single ``Range: bytes=...`` gets a 206 with
+just that slice (honouring If-Range). Requests for several ranges at once
+get the whole file, which RFC 9110 allows.
+"""
+
+import os
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+_UNSATISFIABLE = object()
+
+
+class _FileSlice:
+    """The first ``length`` bytes of ``file`` from its current position."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _requested_range(request, etag, size):
+    """Return (start, end) of a satisfiable single range, _UNSATISFIABLE, or None."""
+    header = request.META.get("HTTP_RANGE")
+    if not header or request.method not in ("GET", "HEAD"):
+        return None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range and if_range != etag:
+        # The client's copy is stale: send the whole file.
+        return None
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # bytes=-N: the last N bytes.
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start < 0 or start > end or start >= size:
+        return _UNSATISFIABLE
+    return start, end
+
+
+def file_response(request, path, etag, content_type, headers=None):
+    """
+    Serve the file at ``path`` with the strong validator ``etag`` (unquoted).
+    ``headers`` are set on every response, 304s included. Raises
+    FileNotFoundError when there is no such file.
+    """
+    etag = quote_etag(etag)
+    headers = {"ETag": etag, **(headers or {})}
+
+    # Closed by FileResponse once it has been sent.
+    file = open(path, "rb")  # noqa: SIM115
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        file.close()
+    else:
+        size = os.fstat(file.fileno()).st_size
+        byte_range = _requested_range(request, etag, size)
+        if byte_range is _UNSATISFIABLE:
+            file.close()
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+        elif byte_range:
+            start, end = byte_range
+            file.seek(start)
+            length = end - start + 1
+            body = file if end == size - 1 else _FileSlice(file, length)
+            response = FileResponse(body, status=206, content_type=content_type)
+            response["Content-Length"] = length
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            response = FileResponse(file, content_type=content_type)
+        response["Accept-Ranges"] = "bytes"
+
+    for name, value in headers.items():
+        response[name] = value
+    return response
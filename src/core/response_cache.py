@@ -0,0 +1,207 @@
+"""
+In-process cache for pages whose output does not depend on the request.
+
+Views opt in with the ``cache_response`` decorator and the whole cache is
+switched on with the RESPONSE_CACHE_ENABLED setting. The first GET of a page
+is rendered normally and its bytes are kept, together with a gzip variant and
+a strong ETag for each, so later hits skip template rendering entirely and
+clients revalidating with If-None-Match get a 304.
+
+Entries live in the worker process, so a deploy (which restarts the workers)
+starts from an empty cache, and the development autoreloader clears it
+whenever a template or other watched file changes. ETags are content hashes,
+so they only change when the rendered output does.
+
+Cached bytes can't carry a per-request CSRF token. Pages that are cached must
+not use ``{% csrf_token %}``: responses whose rendering asked for a token are
+served but never stored. Form pages use ``csrf_cookie=True`` instead, which
+makes sure every response sets the CSRF cookie, and fill the hidden
+``csrfmiddlewaretoken`` field from that cookie in the browser.
+"""
+
+import gzip
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.autoreload import file_changed
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+
+# Same rules as django.middleware.gzip: small bodies aren't worth compressing.
+GZIP_MIN_LENGTH = 200
+
+
+def accepts_gzip(request):
+    """
+    Whether the request's Accept-Encoding allows gzip: listed, as gzip or
+    x-gzip, or covered by ``*``, with a q-value above 0.
+    """
+    qvalues = {}
+    for coding in request.headers.get("Accept-Encoding", "").split(","):
+        name, *params = (part.strip() for part in coding.split(";"))
+        qvalue = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[name.lower()] = qvalue
+    qvalue = qvalues.get("gzip", qvalues.get("x-gzip", qvalues.get("*", 0.0)))
+    return qvalue > 0
+
+
+def _etag(content):
+    return quote_etag(hashlib.md5(content, usedforsecurity=False).hexdigest())
+
+
+class CachedPage:
+    """Rendered bytes of one page, plus its gzip variant when it is smaller."""
+
+    def __init__(self, content, content_type, headers):
+        self.content = content
+        self.etag = _etag(content)
+        self.content_type = content_type
+        self.headers = headers
+
+        self.gzip_content = self.gzip_etag = None
+        if len(content) >= GZIP_MIN_LENGTH:
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) < len(content):
+                self.gzip_content = compressed
+                self.gzip_etag = _etag(compressed)
+
+    @classmethod
+    def from_response(cls, response):
+        """Return a CachedPage for ``response``, or None if it can't be shared."""
+        if (
+            response.status_code != 200
+            or response.streaming
+            or response.cookies
+            or response.has_header("Content-Encoding")
+            or response.has_header("Vary")
+        ):
+            return None
+        headers = [
+            (name, value)
+            for name, value in response.items()
+            if name.lower() not in ("content-type", "content-length")
+        ]
+        return cls(response.content, response["Content-Type"], headers)
+
+    def response(self, request):
+        """Build the response for ``request``: 304, gzip or identity."""
+        if self.gzip_content is not None and accepts_gzip(request):
+            content, etag = self.gzip_content, self.gzip_etag
+        else:
+            content, etag = self.content, self.etag
+
+        response = HttpResponse(content, content_type=self.content_type)
+        for name, value in self.headers:
+            response[name] = value
+        if content is self.gzip_content:
+            response["Content-Encoding"] = "gzip"
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        if self.gzip_content is not None:
+            patch_vary_headers(response, ("Accept-Encoding",))
+
+        return get_conditional_response(request, etag=etag, response=response)
+
+
+class ResponseCache:
+    """Cached pages keyed by (view, path)."""
+
+    def __init__(self):
+        self._pages = {}
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        page = self._pages.get(key)
+        if page is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return page
+
+    def set(self, key, page):
+        self._pages[key] = page
+
+    def clear(self):
+        self._pages.clear()
+
+    def info(self):
+        return {
+            "enabled": settings.RESPONSE_CACHE_ENABLED,
+            "pages": len(self._pages),
+            "bytes": sum(
+                len(page.content) + len(page.gzip_content or b"")
+                for page in self._pages.values()
+            ),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+response_cache = ResponseCache()
+
+
+@receiver(file_changed, dispatch_uid="response_cache_file_changed")
+def _clear_on_file_change(sender, file_path, **kwargs):
+    # Python changes restart the server anyway; this covers the files that
+    # are reloaded in place, templates in particular. Returning None lets
+    # the other receivers decide whether a restart is needed.
+    response_cache.clear()
+
+
+def _is_cacheable_request(request):
+    return (
+        settings.RESPONSE_CACHE_ENABLED
+        and request.method in ("GET", "HEAD")
+        and not request.META.get("QUERY_STRING")
+    )
+
+
+def cache_response(view_func=None, *, csrf_cookie=False):
+    """
+    Serve the view's response from the in-process cache.
+
+    Only GET and HEAD requests without a query string are cached; anything
+    else (form submissions, lab payloads in the URL) is rendered as usual.
+    With ``csrf_cookie`` every response, cached or not, sets the CSRF cookie
+    so the page's forms can read their token from it.
+    """
+    if view_func is None:
+        return lambda view_func: cache_response(view_func, csrf_cookie=csrf_cookie)
+
+    view_name = f"{view_func.__module__}.{view_func.__qualname__}"
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _is_cacheable_request(request):
+            response = view_func(request, *args, **kwargs)
+        else:
+            key = (view_name, request.path)
+            page = response_cache.get(key)
+            if page is None:
+                token_requested = request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+                response = view_func(request, *args, **kwargs)
+                # get_token() flags the cookie for update: the body may now
+                # embed this client's token and must not be shared.
+                if request.META.get("CSRF_COOKIE_NEEDS_UPDATE") == token_requested:
+                    page = CachedPage.from_response(response)
+                if page is not None:
+                    response_cache.set(key, page)
+            if page is not None:
+                response = page.response(request)
+
+        if csrf_cookie:
+            get_token(request)
+        return response
+
+    return wrapper
@@ -0,0 +1,39 @@
+"""
+Database routing: lab data lives in its own SQLite file.
+
+SQLite has one write lock per database file. Keeping the models of the lab
+apps (everything under the ``labs`` package) in the "labs" database means
+a burst of comment posts never queues behind, or in front of, session and
+auth writes in the "default" database.
+
+Rows written to "default" before the split stay in its old tables, where
+no query reaches them; ``manage.py copy_lab_data`` copies them over.
+"""
+
+LABS_DATABASE = "labs"
+
+
+def is_lab_app(app_label):
+    from django.apps import apps
+
+    return apps.get_app_config(app_label).name.startswith("labs.")
+
+
+class LabsRouter:
+    def db_for_read(self, model, **hints):
+        if is_lab_app(model._meta.app_label):
+            return LABS_DATABASE
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Rows in different SQLite files can't reference each other.
+        return is_lab_app(obj1._meta.app_label) == is_lab_app(obj2._meta.app_label)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Other aliases (scratch databases in tests and benchmarks) get
+        # every app.
+        if db not in ("default", LABS_DATABASE):
+            return None
+        return is_lab_app(app_label) == (db == LABS_DATABASE)
@@ -24,8 +24,14 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Simplified: Load environment variables using dotenv_values
 
 env = dotenv_values()
+
+
+def env_flag(name, default="False"):
+    return str(env.get(name, default)).strip().lower() in ("1", "true", "yes")
+
+
 SECRET_KEY = env.get("SECRET_KEY")
-DEBUG = str(env.get("DEBUG", "False")).strip().lower() in ("1", "true", "yes")
+DEBUG = env_flag("DEBUG")
 
 
 ALLOWED_HOSTS = ["*"]
@@ -42,7 +48,7 @@ DJANGO_CORE_APPS = [
 ]
 
 THIRD_PARTY_APPS = [
-    #    'django_tailwind_cli',
+    "django_tailwind_cli",
 ]
 
 CUSTOM_APPS = [
@@ -54,6 +60,7 @@ INSTALLED_APPS = DJANGO_CORE_APPS + THIRD_PARTY_APPS + CUSTOM_APPS
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.staticfiles.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -64,6 +71,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "core.urls"
 
+# Finds the tests of the apps under src/ (see core.test_runner).
+TEST_RUNNER = "core.test_runner.ProjectTestRunner"
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -85,13 +95,50 @@ WSGI_APPLICATION = "core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLITE_PROFILE picks how connections are configured. "default" is Django's
+# out-of-the-box behaviour: rollback journal, a new connection per request.
+# "production" keeps connections open between requests and sets them up for
+# concurrent readers and writers when they are created: WAL (readers no
+# longer block behind a writer), synchronous=NORMAL (no fsync per commit in
+# WAL mode), a busy timeout instead of immediate "database is locked"
+# errors, memory-mapped reads, and BEGIN IMMEDIATE so writers queue on the
+# busy timeout rather than failing on a lock upgrade.
+SQLITE_PROFILES = {
+    "default": {},
+    "production": {
+        "CONN_MAX_AGE": int(env.get("SQLITE_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                f"PRAGMA mmap_size={int(env.get('SQLITE_MMAP_SIZE', 256 * 2**20))};"
+            ),
+            "timeout": float(env.get("SQLITE_BUSY_TIMEOUT", 20)),
+            "transaction_mode": "IMMEDIATE",
+        },
+    },
+}
+SQLITE_PROFILE = env.get("SQLITE_PROFILE", "default")
+
+# Lab data (the models of the labs.* apps) is kept in its own file so that
+# its writes don't contend with sessions and auth for one SQLite write lock;
+# see core.routers. Create it with: manage.py migrate --database=labs
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+        **SQLITE_PROFILES[SQLITE_PROFILE],
+    },
+    "labs": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "labs.sqlite3",
+        **SQLITE_PROFILES[SQLITE_PROFILE],
+    },
 }
 
+DATABASE_ROUTERS = ["core.routers.LabsRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,3 +179,119 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
+
+# collectstatic writes content-hashed copies of the static files, listed in
+# a manifest that {% static %} reads, and gzip variants of the text ones (see
+# core.staticfiles). With SERVE_STATIC on, the app serves STATIC_ROOT itself,
+# with immutable caching for the hashed names. STATICFILES_BUNDLES lists the
+# functions yielding the (name, content) of static files generated from the
+# code, which collectstatic writes out before hashing.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "core.staticfiles.CompressedManifestStaticFilesStorage",
+    },
+}
+STATICFILES_BUNDLES = [
+    "whoami.templatetags.scripts.bundles",
+]
+SERVE_STATIC = env_flag("SERVE_STATIC", "True")
+
+
+# Response cache
+# Serve views decorated with core.response_cache.cache_response from
+# pre-rendered bytes (with gzip variants, ETags and 304s). Off by default.
+RESPONSE_CACHE_ENABLED = env_flag("RESPONSE_CACHE_ENABLED")
+
+
+# XSS lab settings
+
+# Evaluation mode for labs.xss.detection: "compiled" is fastest on ordinary
+# input, "linear" guarantees linear-time matching on hostile input,
+# "instrumented" records per-pattern statistics and "adaptive" tries the
+# most frequently matching patterns first.
+XSS_DETECTOR_MODE = env.get("XSS_DETECTOR_MODE", "compiled")
+
+# Number of payload verdicts kept in the detector's in-process LRU cache
+# (0 disables it).
+XSS_DETECTOR_CACHE_SIZE = int(env.get("XSS_DETECTOR_CACHE_SIZE", 4096))
+
+# Comments per page in the stored XSS lab's keyset-paginated feed.
+XSS_COMMENTS_PAGE_SIZE = int(env.get("XSS_COMMENTS_PAGE_SIZE", 20))
+
+# Queue stored XSS comments in memory and write them in batches of up to
+# XSS_COMMENT_BATCH_SIZE, at most XSS_COMMENT_BATCH_DELAY seconds after the
+# first one was queued. Off by default: every comment is its own INSERT.
+XSS_COMMENT_WRITE_BEHIND = env_flag("XSS_COMMENT_WRITE_BEHIND")
+XSS_COMMENT_BATCH_SIZE = int(env.get("XSS_COMMENT_BATCH_SIZE", 100))
+XSS_COMMENT_BATCH_DELAY = float(env.get("XSS_COMMENT_BATCH_DELAY", 0.5))
+
+# Retention for stored XSS comments: keep at most XSS_COMMENT_MAX_ROWS and
+# nothing older than XSS_COMMENT_MAX_AGE_DAYS (0 = no limit). Every
+# XSS_COMMENT_PURGE_INTERVAL inserts one batch of up to
+# XSS_COMMENT_PURGE_BATCH_SIZE excess comments is deleted in the background.
+XSS_COMMENT_MAX_ROWS = int(env.get("XSS_COMMENT_MAX_ROWS", 0))
+XSS_COMMENT_MAX_AGE_DAYS = int(env.get("XSS_COMMENT_MAX_AGE_DAYS", 0))
+XSS_COMMENT_PURGE_INTERVAL = int(env.get("XSS_COMMENT_PURGE_INTERVAL", 100))
+XSS_COMMENT_PURGE_BATCH_SIZE = int(env.get("XSS_COMMENT_PURGE_BATCH_SIZE", 500))
+
+# Whose comments a stored XSS page shows: "off" (one shared feed),
+# "session" (a private feed per browser) or "room" (feeds shared by
+# browsers that joined the same ?room=<name>).
+XSS_COMMENT_PARTITIONING = env.get("XSS_COMMENT_PARTITIONING", "off")
+
+
+# File Upload XSS lab: an upload is aborted as soon as it passes
+# XSS_UPLOAD_MAX_SIZE bytes, and only its first XSS_UPLOAD_PREVIEW_CHARS
+# characters are rendered. Uploads over FILE_UPLOAD_MAX_MEMORY_SIZE bytes
+# are spooled to a temporary file rather than held in memory.
+XSS_UPLOAD_MAX_SIZE = int(env.get("XSS_UPLOAD_MAX_SIZE", 10 * 1024 * 1024))
+XSS_UPLOAD_PREVIEW_CHARS = int(env.get("XSS_UPLOAD_PREVIEW_CHARS", 20000))
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(env.get("FILE_UPLOAD_MAX_MEMORY_SIZE", 2621440))
+
+# Content-addressed store for the File Upload XSS lab: identical uploads are
+# stored once, named by their SHA-256. At most XSS_UPLOAD_STORE_MAX_FILES are
+# kept (0 = no limit); the least recently uploaded go first.
+XSS_UPLOAD_STORE_DIR = env.get("XSS_UPLOAD_STORE_DIR", BASE_DIR / "uploads")
+XSS_UPLOAD_STORE_MAX_FILES = int(env.get("XSS_UPLOAD_STORE_MAX_FILES", 1000))
+
+# Content-Type XSS lab: how long clients and shared caches may reuse a
+# directly served (?direct=1) response. Responses also carry an ETag and
+# Last-Modified, so revalidation gets a 304.
+XSS_DIRECT_SERVE_MAX_AGE = int(env.get("XSS_DIRECT_SERVE_MAX_AGE", 3600))
+
+# Route the I/O-bound labs (stored XSS, file upload, Content-Type) to their
+# async view variants. Turn on when serving through core.asgi; under WSGI
+# every async view pays for an event loop, so the sync views are faster.
+XSS_ASYNC_VIEWS = env_flag("XSS_ASYNC_VIEWS")
+
+
+# WebSocket XSS lab backend (served by core.asgi): per-connection send queue
+# length, messages of history replayed to late joiners per room, and what
+# to do with a consumer whose queue is full ("drop" its oldest message or
+# "disconnect" it).
+XSS_WEBSOCKET_QUEUE_SIZE = int(env.get("XSS_WEBSOCKET_QUEUE_SIZE", 64))
+XSS_WEBSOCKET_HISTORY = int(env.get("XSS_WEBSOCKET_HISTORY", 50))
+XSS_WEBSOCKET_SLOW_CONSUMER = env.get("XSS_WEBSOCKET_SLOW_CONSUMER", "drop")
+
+# Markdown XSS lab: rendered documents kept per worker, keyed by content
+# (0 disables the cache). POST bodies are capped by
+# DATA_UPLOAD_MAX_MEMORY_SIZE, which bounds the size of each entry.
+XSS_MARKDOWN_CACHE_SIZE = int(env.get("XSS_MARKDOWN_CACHE_SIZE", 32))
+
+
+# Tailwind CSS is compiled ahead of time by django-tailwind-cli: `manage.py
+# tailwind build` turns assets/css/tailwind.css into a minified
+# static/css/tailwind.css holding only the utilities the templates use, and
+# `manage.py tailwind runserver` rebuilds it on every change. Without
+# network access, point TAILWIND_CLI_PATH at a tailwindcss binary and turn
+# TAILWIND_CLI_AUTOMATIC_DOWNLOAD off. TAILWIND_CDN loads the in-browser
+# compiler from cdn.tailwindcss.com instead, e.g. to compare the two.
+TAILWIND_CLI_VERSION = "4.3.3"
+TAILWIND_CLI_SRC_CSS = "assets/css/tailwind.css"
+TAILWIND_CLI_DIST_CSS = "css/tailwind.css"
+TAILWIND_CLI_PATH = env.get("TAILWIND_CLI_PATH", ".django_tailwind_cli")
+TAILWIND_CLI_AUTOMATIC_DOWNLOAD = env_flag("TAILWIND_CLI_AUTOMATIC_DOWNLOAD", "True")
+TAILWIND_CDN = env_flag("TAILWIND_CDN")
@@ -0,0 +1,183 @@
+"""
+Static files with hashed names and gzip variants, served by the app itself.
+
+CompressedManifestStaticFilesStorage is Django's ManifestStaticFilesStorage:
+collectstatic copies js/xss_common.js to STATIC_ROOT along with
+js/xss_common.<hash>.js, and ``{% static %}`` links the hashed name, which
+changes whenever the content does. It also writes ``<name>.gz`` next to every
+text file that gzip makes smaller, compressed once at build time. Files
+generated from the code, such as the scripts pages wrap in ``{% script %}``
+(see whoami.templatetags.scripts), are written out as static files first,
+so they get the same treatment: the STATICFILES_BUNDLES setting lists the
+functions that yield them, as ``(name, content)`` pairs.
+
+StaticFilesMiddleware serves STATIC_ROOT from the app, so gunicorn can serve
+static files without a proxy in front. It indexes STATIC_ROOT when the
+process starts, which makes each request a dictionary lookup (no path from
+the URL ever reaches the filesystem) and a file_response(): sendfile,
+ETags, 304s and ranges. Clients that accept gzip get the .gz variant.
+Hashed names are cached for a year as immutable, and the names without a
+hash are revalidated on every use. Run collectstatic before starting the
+server; files collected later are served after a restart. Until it has run,
+pages link the names without a hash instead of failing.
+"""
+
+import gzip
+import mimetypes
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    staticfiles_storage,
+)
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.utils.module_loading import import_string
+
+from .file_responses import file_response
+from .response_cache import GZIP_MIN_LENGTH, accepts_gzip
+
+COMPRESSIBLE_EXTENSIONS = (
+    ".css",
+    ".html",
+    ".js",
+    ".json",
+    ".map",
+    ".mjs",
+    ".svg",
+    ".txt",
+    ".xml",
+)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes the STATICFILES_BUNDLES
+    before hashing and gzip variants after. Names missing from the manifest
+    (or the whole manifest, before the first collectstatic) are linked
+    without a hash.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # Outside the manifest, Django hashes the collected file, and raises
+        # ValueError when there's none.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for path in getattr(settings, "STATICFILES_BUNDLES", ()):
+                for name, content in import_string(path)():
+                    if self.exists(name):
+                        self.delete(name)
+                    self._save(name, ContentFile(content.encode()))
+                    paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                compressed_name = self._compress(name)
+                if compressed_name:
+                    yield name, compressed_name, True
+
+    def _compress(self, name):
+        """Write ``name``.gz and return its name, or None if gzip doesn't pay."""
+        with self.open(name) as original:
+            content = original.read()
+        compressed_name = f"{name}.gz"
+        if self.exists(compressed_name):
+            self.delete(compressed_name)
+        if len(content) < GZIP_MIN_LENGTH:
+            return None
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return None
+        self._save(compressed_name, ContentFile(compressed))
+        return compressed_name
+
+
+def _etag(stat):
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def build_index(root, immutable_names=()):
+    """
+    Return ``{name: (path, etag, gzip_path, gzip_etag, content_type, headers)}``
+    for the files under ``root``, ``name`` being the path below STATIC_URL.
+    """
+    immutable_names = set(immutable_names)
+    index = {}
+    for path in Path(root).rglob("*"):
+        if not path.is_file() or path.suffix == ".gz":
+            continue
+        name = path.relative_to(root).as_posix()
+        gzip_path = path.with_name(f"{path.name}.gz")
+        gzip_etag = None
+        if gzip_path.is_file():
+            gzip_etag = _etag(gzip_path.stat())
+        else:
+            gzip_path = None
+        headers = {
+            "Cache-Control": IMMUTABLE if name in immutable_names else REVALIDATE
+        }
+        if gzip_path:
+            headers["Vary"] = "Accept-Encoding"
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        index[name] = (
+            str(path),
+            _etag(path.stat()),
+            gzip_path and str(gzip_path),
+            gzip_etag,
+            content_type,
+            headers,
+        )
+    return index
+
+
+class StaticFilesMiddleware:
+    """
+    Serve the files collected in STATIC_ROOT. Goes right after
+    SecurityMiddleware; switched off by the SERVE_STATIC setting.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVE_STATIC or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.index = build_index(
+            settings.STATIC_ROOT,
+            getattr(staticfiles_storage, "hashed_files", {}).values(),
+        )
+        if not self.index:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            entry = self.index.get(request.path.removeprefix(self.prefix))
+            if entry is not None:
+                return self.serve(request, *entry)
+        return self.get_response(request)
+
+    def serve(self, request, path, etag, gzip_path, gzip_etag, content_type, headers):
+        if gzip_path and accepts_gzip(request):
+            path, etag = gzip_path, gzip_etag
+            headers = {**headers, "Content-Encoding": "gzip"}
+        try:
+            response = file_response(request, path, etag, content_type, headers)
+        except FileNotFoundError:
+            # Removed since the index was built.
+            return self.get_response(request)
+        # FileResponse names the file it was given, which may be the .gz.
+        response.headers.pop("Content-Disposition", None)
+        return response
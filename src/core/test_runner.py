@@ -0,0 +1,27 @@
+"""
+Test runner for the project layout.
+
+The apps live under src/, which isn't a package, and labs/ is a namespace
+package; unittest's discovery descends into neither. Without labels,
+``manage.py test`` therefore discovers the tests of every installed app
+whose code is in this project, from the app's directory, with src/ as the
+top level.
+"""
+
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class ProjectTestRunner(DiscoverRunner):
+    def build_suite(self, test_labels=None, **kwargs):
+        if not test_labels:
+            self.top_level = str(settings.BASE_DIR)
+            test_labels = [
+                config.path
+                for config in apps.get_app_configs()
+                if Path(config.path).is_relative_to(settings.BASE_DIR)
+            ]
+        return super().build_suite(test_labels, **kwargs)
@@ -1,6 +1,39 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class XssConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "labs.xss"
+
+    def ready(self):
+        from . import detection, ingest, markdown, partitions, retention, uploads
+
+        detection.set_default_mode(
+            getattr(settings, "XSS_DETECTOR_MODE", detection.MODE_COMPILED)
+        )
+        detection.verdict_cache.resize(
+            getattr(settings, "XSS_DETECTOR_CACHE_SIZE", 4096)
+        )
+        markdown.render_cache.resize(getattr(settings, "XSS_MARKDOWN_CACHE_SIZE", 32))
+        ingest.comment_buffer.configure(
+            max_size=getattr(settings, "XSS_COMMENT_BATCH_SIZE", 100),
+            max_delay=getattr(settings, "XSS_COMMENT_BATCH_DELAY", 0.5),
+        )
+        retention.pruner.interval = getattr(settings, "XSS_COMMENT_PURGE_INTERVAL", 100)
+        uploads.store.configure(
+            root=getattr(
+                settings, "XSS_UPLOAD_STORE_DIR", settings.BASE_DIR / "uploads"
+            ),
+            max_files=getattr(settings, "XSS_UPLOAD_STORE_MAX_FILES", 1000),
+        )
+
+        partitioning = getattr(
+            settings, "XSS_COMMENT_PARTITIONING", partitions.MODE_OFF
+        )
+        if partitioning not in partitions.MODES:
+            raise ImproperlyConfigured(
+                f"XSS_COMMENT_PARTITIONING must be one of {partitions.MODES}, "
+                f"not {partitioning!r}"
+            )
@@ -0,0 +1,552 @@
+"""
+XSS payload detection for the labs.
+
+The pattern and literal lists below are compiled once at import time into a
+single regular expression, so each payload is scanned in one pass instead of
+once per pattern.
+"""
+
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .lru import LRUCache
+
+# XSS pattern list
+XSS_PATTERNS = (
+    # Script tags
+    r"<script[\s\S]*?>",
+    r"</script>",
+    r"<script[\s\S]*?/>",
+    # Event handlers
+    r"on\w+\s*=",
+    r"onabort\s*=",
+    r"onblur\s*=",
+    r"onchange\s*=",
+    r"onclick\s*=",
+    r"ondblclick\s*=",
+    r"onerror\s*=",
+    r"onfocus\s*=",
+    r"onkeydown\s*=",
+    r"onkeypress\s*=",
+    r"onkeyup\s*=",
+    r"onload\s*=",
+    r"onmousedown\s*=",
+    r"onmousemove\s*=",
+    r"onmouseout\s*=",
+    r"onmouseover\s*=",
+    r"onmouseup\s*=",
+    r"onreset\s*=",
+    r"onresize\s*=",
+    r"onselect\s*=",
+    r"onsubmit\s*=",
+    r"onunload\s*=",
+    r"oncontextmenu\s*=",
+    r"ondrag\s*=",
+    r"ondrop\s*=",
+    # JavaScript URLs
+    r"javascript\s*:",
+    r"vbscript\s*:",
+    r"data\s*:\s*text/html",
+    r"data\s*:\s*application/javascript",
+    # Dangerous HTML tags
+    r"<iframe[\s\S]*?>",
+    r"<object[\s\S]*?>",
+    r"<embed[\s\S]*?>",
+    r"<applet[\s\S]*?>",
+    r"<meta[\s\S]*?>",
+    r"<link[\s\S]*?>",
+    r"<style[\s\S]*?>",
+    r"<base[\s\S]*?>",
+    # Image with event handlers
+    r"<img[\s\S]*?on\w+[\s\S]*?>",
+    r"<svg[\s\S]*?on\w+[\s\S]*?>",
+    # Form elements with events
+    r"<input[\s\S]*?on\w+[\s\S]*?>",
+    r"<button[\s\S]*?on\w+[\s\S]*?>",
+    r"<textarea[\s\S]*?on\w+[\s\S]*?>",
+    r"<select[\s\S]*?on\w+[\s\S]*?>",
+    # JavaScript functions
+    r"alert\s*\(",
+    r"confirm\s*\(",
+    r"prompt\s*\(",
+    r"eval\s*\(",
+    r"settimeout\s*\(",
+    r"setinterval\s*\(",
+    r"function\s*\(",
+    # DOM manipulation
+    r"document\.",
+    r"window\.",
+    r"location\.",
+    r"\.innerhtml",
+    r"\.outerhtml",
+    r"\.write\s*\(",
+    r"\.writeln\s*\(",
+    # CSS expressions
+    r"expression\s*\(",
+    r"behavior\s*:",
+    r"-moz-binding",
+    r"@import",
+    # Template injection patterns
+    r"\{\{[\s\S]*?\}\}",
+    r"\$\{[\s\S]*?\}",
+    r"<%[\s\S]*?%>",
+    # Encoded patterns
+    r"&#x?\d+;",
+    r"%3c%73%63%72%69%70%74",  # URL encoded <script
+    r"&lt;script",
+    r"&lt;img",
+    r"\\u[0-9a-f]{4}",  # Unicode encoding
+    # Data URIs
+    r"data:[\w/]+;base64,",
+    # XML/XHTML patterns
+    r"<\?xml[\s\S]*?\?>",
+    r"<!doctype[\s\S]*?>",
+    r"<!\[cdata\[",
+    # Common bypass attempts
+    r"scr\w*ipt",  # Like "scr" + something + "ipt"
+    r"java\w*script",  # Like "java" + something + "script"
+    r"vb\w*script",
+    # HTML5 specific
+    r"<audio[\s\S]*?on\w+[\s\S]*?>",
+    r"<video[\s\S]*?on\w+[\s\S]*?>",
+    r"<canvas[\s\S]*?on\w+[\s\S]*?>",
+    r"<details[\s\S]*?on\w+[\s\S]*?>",
+    # Form action manipulation
+    r"formaction\s*=",
+    r'action\s*=\s*["\']javascript:',
+    # CSS injection
+    r"@media[\s\S]*?\{",
+    r"@keyframes[\s\S]*?\{",
+    # WebRTC and other modern APIs
+    r"navigator\.",
+    r"geolocation\.",
+    r"webkitrtc",
+    r"mozrtc",
+)
+
+# Additional checks for common XSS vectors
+DANGEROUS_STRINGS = (
+    "javascript:",
+    "vbscript:",
+    "data:text/html",
+    "onload=",
+    "onerror=",
+    "onclick=",
+    "onmouseover=",
+    "alert(",
+    "confirm(",
+    "prompt(",
+    "eval(",
+    "document.cookie",
+    "document.write",
+    "window.location",
+    "innerHTML",
+    "outerHTML",
+    "insertAdjacentHTML",
+    "setTimeout",
+    "setInterval",
+    "Function(",
+    "constructor",
+    "prototype",
+    "__proto__",
+    "expression(",
+    "behavior:",
+    "-moz-binding",
+    "import",
+    "url(",
+    "@import",
+    "script:",
+    "about:",
+    "chrome:",
+    "resource:",
+    "moz-icon:",
+    "ms-its:",
+    "mk:",
+    "wyciwyg:",
+    "jar:",
+    "view-source:",
+    "gopher:",
+    "finger:",
+    "feed:",
+    "pcast:",
+    "webcal:",
+    "wyciwyg:",
+)
+
+
+# Characters that survive ``str.lower()`` but still match an ASCII letter
+# under re.IGNORECASE (dotless i and long s). Lowered text without them
+# matches the all-lowercase pattern set identically with or without the
+# flag, which lets the common case skip case-insensitive matching.
+_CASE_FOLDING_CHARS = ("\u0131", "\u017f")
+
+
+def _literal_trie(literals):
+    """
+    Build a trie of ``literals`` as nested dicts keyed by character.
+
+    Only containment matters to the detector, so a literal that extends a
+    shorter one is dropped.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return trie
+
+
+def _trie_regex(node):
+    """
+    Render a trie node as a regex. Shared prefixes are emitted once, so the
+    alternation never tries every literal at every position.
+    """
+    if "" in node:
+        return ""
+    branches = [re.escape(char) + _trie_regex(child) for char, child in node.items()]
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def _split_leading_literal(pattern):
+    """
+    Split ``pattern`` into its leading literal character and the remainder.
+    Returns ``(None, pattern)`` when the pattern does not start with a
+    plain, unquantified character.
+    """
+    if "|" in pattern:
+        return None, pattern
+    if pattern[:1] == "\\" and not pattern[1:2].isalnum():
+        char, rest = pattern[1], pattern[2:]
+    elif pattern[:1] and pattern[0] not in "()[].^$*+?{|\\":
+        char, rest = pattern[0], pattern[1:]
+    else:
+        return None, pattern
+    if rest[:1] and rest[0] in "*+?{":
+        return None, pattern
+    return char, rest
+
+
+def _compile_detector(patterns, literals, flags=0):
+    """
+    Combine the regex patterns and the literal strings into one expression.
+
+    Branches are grouped under their leading character, so at any position
+    the engine rejects whole groups with a single comparison. Literals were
+    matched with a case-sensitive ``in`` check; under IGNORECASE they are
+    kept in their own branch with the flag turned back off.
+    """
+    groups = {}
+    ungrouped = []
+    for pattern in patterns:
+        char, rest = _split_leading_literal(pattern)
+        if char is None:
+            ungrouped.append(f"(?:{pattern})")
+        else:
+            groups.setdefault(char, []).append(f"(?:{rest})")
+
+    trie = _literal_trie(literals)
+    if flags & re.IGNORECASE:
+        ungrouped.append(f"(?-i:{_trie_regex(trie)})")
+    else:
+        for char, node in trie.items():
+            groups.setdefault(char, []).append(_trie_regex(node))
+
+    branches = [
+        re.escape(char) + "(?:" + "|".join(bodies) + ")"
+        for char, bodies in groups.items()
+    ]
+    return re.compile("|".join(branches + ungrouped), flags)
+
+
+# Lazy "anything" gap. Patterns built from literals joined by it are
+# checked as ordered subsequences in linear mode.
+_LAZY_GAP = r"[\s\S]*?"
+
+# A run of word characters followed by ``\w*`` / ``\w+``, e.g. ``scr\w*ipt``.
+_WORD_RUN_PATTERN = re.compile(r"([a-z]+)(\\w[*+].*)")
+
+
+def _linear_search(pattern, flags):
+    r"""
+    Return a linear-time search function for ``pattern``, or None when a
+    plain regex search is already linear.
+
+    The backtracking engine retries lazy gaps such as ``<img[\s\S]*?on\w+``
+    from every opener, which is quadratic (or worse) on inputs full of
+    openers that never close. Those patterns are checked without
+    backtracking instead:
+
+    * gap patterns are split on ``[\s\S]*?`` and each piece is searched
+      from where the previous one ended. The leftmost occurrence of a piece
+      always leaves the most room for the rest, so a single forward scan
+      gives the same answer;
+    * word-run patterns such as ``scr\w*ipt`` or ``on\w+\s*=`` look for
+      their head and try the tail once per run of word characters. A later
+      head in the same run only sees a suffix of that run, so if the first
+      one fails they all do and the scan moves past the run.
+    """
+    if _LAZY_GAP in pattern:
+        pieces = [re.compile(piece, flags) for piece in pattern.split(_LAZY_GAP)]
+
+        def search_sequence(text):
+            pos = 0
+            for piece in pieces:
+                match = piece.search(text, pos)
+                if match is None:
+                    return False
+                pos = match.end()
+            return True
+
+        return search_sequence
+
+    word_run = _WORD_RUN_PATTERN.fullmatch(pattern)
+    if word_run:
+        head, tail = (re.compile(part, flags) for part in word_run.groups())
+        run_end = re.compile(r"\w*+", flags)
+
+        def search_word_run(text):
+            pos = 0
+            while match := head.search(text, pos):
+                if tail.match(text, match.end()):
+                    return True
+                pos = run_end.match(text, match.end()).end()
+            return False
+
+        return search_word_run
+
+    return None
+
+
+class _LinearMatcher:
+    """
+    Evaluates the pattern set with matching time linear in the input length.
+    Patterns that backtrack get a dedicated search (see ``_linear_search``);
+    everything else stays in one combined expression.
+    """
+
+    def __init__(self, patterns, literals, flags=0):
+        combined = []
+        self.searches = []
+        for pattern in patterns:
+            search = _linear_search(pattern, flags)
+            if search is None:
+                combined.append(pattern)
+            else:
+                self.searches.append(search)
+        self.combined = _compile_detector(combined, literals, flags)
+
+    def search(self, text):
+        if self.combined.search(text):
+            return True
+        return any(search(text) for search in self.searches)
+
+
+class _Check:
+    """A single pattern or literal with its hit and latency counters."""
+
+    def __init__(self, kind, source, search):
+        self.kind = kind
+        self.source = source
+        self.search = search
+        self.evaluated = 0
+        self.matched = 0
+        self.elapsed_ns = 0
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "source": self.source,
+            "evaluated": self.evaluated,
+            "matched": self.matched,
+            "elapsed_ms": self.elapsed_ns / 1e6,
+        }
+
+
+class _SequentialMatcher:
+    """
+    Evaluates each pattern and literal on its own and records how often it
+    was evaluated, how often it matched and how long it took.
+
+    With ``exhaustive`` every check runs on every input, which gives true
+    per-check hit rates. Otherwise evaluation stops at the first match and
+    every ``reorder_interval`` calls the checks are re-sorted so the ones
+    that matched most often are tried first. Counters are not locked and
+    may undercount slightly under concurrent threads.
+    """
+
+    def __init__(self, patterns, literals, exhaustive=False, reorder_interval=1000):
+        flags = re.IGNORECASE | re.MULTILINE
+        self.checks = [
+            _Check(
+                "pattern",
+                pattern,
+                _linear_search(pattern, flags) or re.compile(pattern, flags).search,
+            )
+            for pattern in patterns
+        ]
+        self.checks += [
+            _Check("literal", literal, lambda text, literal=literal: literal in text)
+            for literal in dict.fromkeys(literals)
+        ]
+        self.exhaustive = exhaustive
+        self.reorder_interval = reorder_interval
+        self.calls = 0
+
+    def search(self, text):
+        self.calls += 1
+        if not self.exhaustive and self.calls % self.reorder_interval == 0:
+            self.checks = sorted(self.checks, key=lambda check: -check.matched)
+
+        found = False
+        for check in self.checks:
+            started = time.perf_counter_ns()
+            matched = check.search(text)
+            check.elapsed_ns += time.perf_counter_ns() - started
+            check.evaluated += 1
+            if matched:
+                check.matched += 1
+                found = True
+                if not self.exhaustive:
+                    break
+        return found
+
+    def reset(self):
+        for check in self.checks:
+            check.evaluated = check.matched = check.elapsed_ns = 0
+        self.calls = 0
+
+
+MODE_COMPILED = "compiled"
+MODE_LINEAR = "linear"
+MODE_INSTRUMENTED = "instrumented"
+MODE_ADAPTIVE = "adaptive"
+
+# Sequential matchers apply the original flags to every check, so they
+# serve both lowered-text variants.
+_INSTRUMENTED = _SequentialMatcher(XSS_PATTERNS, DANGEROUS_STRINGS, exhaustive=True)
+_ADAPTIVE = _SequentialMatcher(XSS_PATTERNS, DANGEROUS_STRINGS)
+
+_DETECTORS = {
+    MODE_COMPILED: (
+        _compile_detector(XSS_PATTERNS, DANGEROUS_STRINGS),
+        _compile_detector(
+            XSS_PATTERNS, DANGEROUS_STRINGS, re.IGNORECASE | re.MULTILINE
+        ),
+    ),
+    MODE_LINEAR: (
+        _LinearMatcher(XSS_PATTERNS, DANGEROUS_STRINGS),
+        _LinearMatcher(XSS_PATTERNS, DANGEROUS_STRINGS, re.IGNORECASE | re.MULTILINE),
+    ),
+    MODE_INSTRUMENTED: (_INSTRUMENTED, _INSTRUMENTED),
+    MODE_ADAPTIVE: (_ADAPTIVE, _ADAPTIVE),
+}
+MODES = tuple(_DETECTORS)
+
+default_mode = MODE_COMPILED
+
+
+def set_default_mode(mode):
+    """Select the evaluation mode used when callers don't pass one."""
+    global default_mode
+    if mode not in _DETECTORS:
+        raise ValueError(f"Unknown XSS detector mode {mode!r}; expected one of {MODES}")
+    default_mode = mode
+
+
+verdict_cache = LRUCache(maxsize=4096)
+
+
+def _evaluate(content, mode):
+    content_lower = content.lower()
+    detector, folding_detector = _DETECTORS[mode]
+    if any(char in content_lower for char in _CASE_FOLDING_CHARS):
+        detector = folding_detector
+    return bool(detector.search(content_lower))
+
+
+def detect_xss_patterns(content, mode=None):
+    """
+    Check if content contains XSS patterns.
+    Returns True if patterns found, False otherwise.
+
+    ``mode`` is one of:
+
+    * ``"compiled"``: one combined regex, fastest on ordinary input;
+    * ``"linear"``: guaranteed linear time on hostile input;
+    * ``"instrumented"``: runs every check separately and records per-check
+      statistics (see ``detector_stats``);
+    * ``"adaptive"``: runs checks separately, most frequent matches first,
+      stopping at the first match.
+
+    All modes give the same verdicts. Repeated payloads are answered from
+    ``verdict_cache``, except in instrumented mode where every call must
+    reach the counters.
+    """
+    if not content or not isinstance(content, str):
+        return False
+
+    mode = mode or default_mode
+    if mode == MODE_INSTRUMENTED:
+        return _evaluate(content, mode)
+    return verdict_cache.get_or_compute(
+        content, lambda content: _evaluate(content, mode)
+    )
+
+
+def detector_stats(mode=MODE_INSTRUMENTED):
+    """
+    Return the per-check counters of an instrumented or adaptive mode, in
+    the order the checks are currently evaluated.
+    """
+    if mode not in (MODE_INSTRUMENTED, MODE_ADAPTIVE):
+        raise ValueError(f"XSS detector mode {mode!r} does not collect statistics")
+    return [check.as_dict() for check in _DETECTORS[mode][0].checks]
+
+
+def reset_detector_stats():
+    """Zero the counters of the instrumented and adaptive modes."""
+    _INSTRUMENTED.reset()
+    _ADAPTIVE.reset()
+
+
+def _detect_chunk(chunk, mode):
+    return [detect_xss_patterns(content, mode) for content in chunk]
+
+
+def detect_xss_patterns_batch(contents, mode=None, workers=None, chunksize=512):
+    """
+    Yield a verdict for each item of ``contents``, in order.
+
+    Items are pulled from the iterable lazily and checked in chunks of
+    ``chunksize`` on a pool of ``workers`` processes (default: one per
+    CPU). At most two chunks per worker are in flight, so memory stays
+    bounded however long the input is. ``workers=1`` checks in-process.
+    """
+    mode = mode or default_mode
+    workers = workers or os.cpu_count() or 1
+    contents = iter(contents)
+    chunks = iter(lambda: list(islice(contents, chunksize)), [])
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _detect_chunk(chunk, mode)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_detect_chunk, chunk, mode))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
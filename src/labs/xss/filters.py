@@ -0,0 +1,125 @@
+"""
+Literal replacement filters for the filter-bypass labs.
+
+A lab's filter set is an ordered list of ``(pattern, replacement)`` pairs,
+configured under ``filters`` in labs.yaml. The filters are meant to be
+bypassable, and how is defined by applying them one after another: each
+one replaces every occurrence of its pattern in the output of the ones
+before it, so removing ``javascript:`` from ``onjavascript:load`` leaves an
+``onload`` for a later filter to catch, while ``<scr<script>ipt>`` still
+comes out as ``<script>``. A pattern is reported as blocked when it
+occurs in its filter's input.
+
+FilterSet.apply() gives exactly that result without every filter scanning
+and copying the whole comment. One str.find sweep per distinct pattern
+locates where the comment is touched at all. A filter can only match text
+within reach of an earlier change (or it would have matched the comment to
+begin with), so the filters run in turn over a window around each
+occurrence, wide enough for every filter in the set to have grown it, and
+the text in between is copied through once. A comment without any pattern
+is returned as is. One so full of patterns that the windows would cover
+much of it is filtered whole instead.
+"""
+
+from types import MappingProxyType
+
+from django.core.exceptions import ImproperlyConfigured
+
+from . import registry
+
+
+class FilterSet:
+    """An ordered set of literal ``(pattern, replacement)`` filters."""
+
+    def __init__(self, filters):
+        self.filters = tuple(filters)
+        if any(not pattern for pattern, _ in self.filters):
+            raise ValueError("Filter patterns must not be empty")
+        self._patterns = tuple({pattern: None for pattern, _ in self.filters})
+        # How far a filter can reach past a change made by the ones before
+        # it, for all of them together.
+        self._margin = sum(
+            len(pattern) + len(replacement) for pattern, replacement in self.filters
+        )
+
+    def _filter(self, text, blocked):
+        for index, (pattern, replacement) in enumerate(self.filters):
+            if pattern in text:
+                blocked.add(index)
+                text = text.replace(pattern, replacement)
+        return text
+
+    def _occurrences(self, text):
+        """
+        Return the sorted (start, end) of every occurrence of every pattern
+        in ``text``, or None if there are so many that windows around them
+        would cover more than an eighth of it.
+        """
+        limit = len(text) // (16 * self._margin)
+        occurrences = []
+        for pattern in self._patterns:
+            start = text.find(pattern)
+            while start >= 0:
+                if len(occurrences) == limit:
+                    return None
+                occurrences.append((start, start + len(pattern)))
+                start = text.find(pattern, start + 1)
+        occurrences.sort()
+        return occurrences
+
+    def apply(self, text):
+        """Return ``(filtered, blocked)``, blocked being patterns in filter order."""
+        blocked = set()
+        occurrences = self._occurrences(text)
+        if occurrences is None:
+            filtered = self._filter(text, blocked)
+        elif not occurrences:
+            return text, []
+        else:
+            margin = self._margin
+            parts = []
+            copied = 0
+            window_start = window_end = None
+            for start, end in occurrences:
+                if window_end is None or start - margin > window_end:
+                    if window_start is not None:
+                        parts.append(
+                            self._filter(text[window_start:window_end], blocked)
+                        )
+                        copied = window_end
+                    window_start = max(start - margin, copied)
+                    parts.append(text[copied:window_start])
+                window_end = max(window_end or 0, end + margin)
+            parts.append(self._filter(text[window_start:window_end], blocked))
+            parts.append(text[window_end:])
+            filtered = "".join(parts)
+        return filtered, [
+            pattern
+            for index, (pattern, _) in enumerate(self.filters)
+            if index in blocked
+        ]
+
+
+def _filter_sets(labs):
+    filter_sets = {}
+    for lab in labs:
+        if "filters" not in lab:
+            continue
+        try:
+            filter_sets[lab["slug"]] = FilterSet(
+                (entry["pattern"], entry.get("replacement", ""))
+                for entry in lab["filters"]
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ImproperlyConfigured(
+                f"Lab {lab['slug']!r} has an invalid filter set: {exc}"
+            ) from exc
+    return MappingProxyType(filter_sets)
+
+
+FILTER_SETS = _filter_sets(registry.LABS)
+
+
+def apply_filters(slug, text):
+    """Run the filter set of lab ``slug`` over ``text``; see FilterSet.apply()."""
+    return FILTER_SETS[slug].apply(text)
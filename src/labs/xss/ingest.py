@@ -0,0 +1,145 @@
+"""
+Write-behind ingestion for stored XSS comments.
+
+With XSS_COMMENT_WRITE_BEHIND on, stored_basic doesn't insert each comment
+in its own transaction. Comments are queued in an in-process buffer, and
+the buffer is written with a single bulk_create once it holds
+XSS_COMMENT_BATCH_SIZE comments or XSS_COMMENT_BATCH_DELAY seconds after
+the first one was queued, whichever comes first. A class submitting at
+once then takes one SQLite write lock per batch rather than one per
+comment.
+
+Until a comment is written, only the browser that posted it can see it:
+the buffer remembers which writer (a random id in a signed cookie) queued
+it, and that writer's pages merge it into the feed. Comments are dated
+when they are written, so the feed's (date, id) order stays the order in
+which comments reached the database. Whatever is still queued when the
+worker exits is written by an atexit handler.
+"""
+
+import atexit
+import threading
+
+from django.db import connections
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from . import retention
+from .models import Comment
+
+WRITER_COOKIE = "xss_writer"
+
+
+def get_writer(request):
+    """Return the writer id from the request's cookie, or None."""
+    return request.get_signed_cookie(WRITER_COOKIE, default=None, salt=WRITER_COOKIE)
+
+
+def set_writer(response, writer):
+    response.set_signed_cookie(WRITER_COOKIE, writer, salt=WRITER_COOKIE, httponly=True)
+
+
+def new_writer():
+    return get_random_string(22)
+
+
+class CommentBuffer:
+    """Comments waiting to be written, in submission order."""
+
+    def __init__(self, max_size=100, max_delay=0.5):
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending = []
+        self._lock = threading.Lock()
+        # Only one flush writes at a time, so a flush can drop exactly the
+        # prefix it wrote while new comments keep being appended.
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def configure(self, max_size, max_delay):
+        self.max_size = max_size
+        self.max_delay = max_delay
+
+    def add(self, writer, name, comment, partition=""):
+        """Queue a comment for ``writer`` and return the unsaved instance."""
+        pending = Comment(name=name, comment=comment, partition=partition)
+        with self._lock:
+            self._pending.append((writer, pending))
+            full = len(self._pending) >= self.max_size
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+        return pending
+
+    def pending_for(self, writer):
+        """Return ``writer``'s comments that may not be written yet, newest first."""
+        with self._lock:
+            return [
+                comment for owner, comment in reversed(self._pending) if owner == writer
+            ]
+
+    def flush(self):
+        """Write every queued comment in one transaction; return how many."""
+        with self._flush_lock:
+            with self._lock:
+                batch = [comment for _, comment in self._pending]
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not batch:
+                return 0
+
+            now = timezone.now()
+            for comment in batch:
+                comment.date = now
+            # Comments stay visible to their writer until they are committed;
+            # bulk_create sets their primary keys, which tells readers that
+            # they are now in the database too.
+            Comment.objects.bulk_create(batch)
+            retention.pruner.note_inserts(len(batch))
+
+            with self._lock:
+                del self._pending[: len(batch)]
+                if self._pending:
+                    self._schedule()
+            return len(batch)
+
+    def _schedule(self):
+        # Called with self._lock held.
+        if self._timer is None:
+            self._timer = threading.Timer(self.max_delay, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            # Keep the comments and try again after another delay.
+            with self._lock:
+                self._timer = None
+                self._schedule()
+            raise
+        finally:
+            connections.close_all()
+
+
+comment_buffer = CommentBuffer()
+atexit.register(comment_buffer.flush)
+
+
+def merge_pending(comments, pending):
+    """
+    Put queued comments in front of a page read from the database.
+
+    ``pending`` must be taken from pending_for() *before* the page is read.
+    A comment written in between has its primary key set by then, and is
+    left out if the page already contains it.
+    """
+    if not pending:
+        return comments
+    stored = {comment.pk for comment in comments}
+    return [
+        comment for comment in pending if comment.pk is None or comment.pk not in stored
+    ] + comments
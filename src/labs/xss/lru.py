@@ -0,0 +1,72 @@
+"""
+The in-process LRU cache shared by the labs' pure functions of a string:
+detector verdicts (labs.xss.detection) and rendered Markdown
+(labs.xss.markdown).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU of values computed from strings.
+
+    Strings up to ``inline_key_length`` characters are their own key;
+    longer ones are keyed by a 16-byte BLAKE2 digest, so the keys take
+    bounded memory whatever the string sizes. Call ``clear()`` whenever
+    the computation changes. ``maxsize=0`` disables caching.
+    """
+
+    inline_key_length = 256
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, content, compute):
+        if not self.maxsize:
+            return compute(content)
+
+        key = content
+        if len(content) > self.inline_key_length:
+            key = hashlib.blake2b(
+                content.encode("utf-8", "surrogatepass"), digest_size=16
+            ).digest()
+        with self._lock:
+            verdict = self._entries.get(key)
+            if verdict is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return verdict
+            self.misses += 1
+
+        verdict = compute(content)
+        with self._lock:
+            self._entries[key] = verdict
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return verdict
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,143 @@
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+
+from labs.xss.models import Comment
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent stored-comment reads and writes against a scratch "
+        "SQLite database under each SQLITE_PROFILES entry and report "
+        "throughput, latency and lock errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            choices=sorted(settings.SQLITE_PROFILES),
+            help="Profile to benchmark (repeatable, default: all).",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Concurrent clients (default: 8).",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=5.0,
+            help="Seconds to run each profile for (default: 5).",
+        )
+        parser.add_argument(
+            "--write-ratio",
+            type=float,
+            default=0.2,
+            help="Fraction of operations that post a comment (default: 0.2).",
+        )
+        parser.add_argument(
+            "--seed-rows",
+            type=int,
+            default=5000,
+            help="Comments in the database before the run (default: 5000).",
+        )
+
+    def handle(self, *args, **options):
+        profiles = options["profile"] or list(settings.SQLITE_PROFILES)
+
+        self.stdout.write(
+            f"{'profile':<12} {'ops/s':>8} {'reads/s':>8} {'writes/s':>9} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for profile in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                result = self._run(profile, Path(directory) / "bench.sqlite3", options)
+            latencies = sorted(result["latencies"])
+            elapsed = options["duration"]
+            self.stdout.write(
+                f"{profile:<12} {len(latencies) / elapsed:>8.0f} "
+                f"{result['reads'] / elapsed:>8.0f} "
+                f"{result['writes'] / elapsed:>9.0f} "
+                f"{latencies[len(latencies) // 2] * 1e3:>8.1f} "
+                f"{latencies[int(len(latencies) * 0.99)] * 1e3:>8.1f} "
+                f"{result['errors']:>7}"
+            )
+
+    def _run(self, profile, path, options):
+        alias = f"bench_{profile}"
+        connections.settings[alias] = {
+            **connections.settings["default"],
+            "NAME": path,
+            "CONN_MAX_AGE": 0,
+            "CONN_HEALTH_CHECKS": False,
+            "OPTIONS": {},
+            **settings.SQLITE_PROFILES[profile],
+        }
+        persistent = connections.settings[alias]["CONN_MAX_AGE"] != 0
+        try:
+            call_command("migrate", database=alias, verbosity=0)
+            Comment.objects.using(alias).bulk_create(
+                Comment(name=f"seed {i}", comment="<b>seed</b>")
+                for i in range(options["seed_rows"])
+            )
+            connections[alias].close()
+
+            result = {"latencies": [], "reads": 0, "writes": 0, "errors": 0}
+            lock = threading.Lock()
+            deadline = time.perf_counter() + options["duration"]
+            clients = [
+                threading.Thread(
+                    target=self._client,
+                    args=(alias, persistent, deadline, options, result, lock),
+                )
+                for _ in range(options["threads"])
+            ]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+            return result
+        finally:
+            connections[alias].close()
+            del connections.settings[alias]
+
+    @staticmethod
+    def _client(alias, persistent, deadline, options, result, lock):
+        comments = Comment.objects.using(alias)
+        latencies = []
+        reads = writes = errors = 0
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    if random.random() < options["write_ratio"]:
+                        comments.create(name="bench", comment="<i>payload</i>")
+                        writes += 1
+                    else:
+                        list(comments.feed()[:20])
+                        reads += 1
+                except OperationalError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+                # What request_finished does at the end of each request.
+                if persistent:
+                    connections[alias].close_if_unusable_or_obsolete()
+                else:
+                    connections[alias].close()
+        finally:
+            connections[alias].close()
+
+        with lock:
+            result["latencies"] += latencies
+            result["reads"] += reads
+            result["writes"] += writes
+            result["errors"] += errors
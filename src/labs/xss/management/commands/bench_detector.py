@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from labs.xss.detection import MODE_LINEAR, MODES, detect_xss_patterns
+
+# Inputs that make backtracking patterns retry from every opener. None of
+# them contains a complete payload, so every check runs to the end.
+PATHOLOGICAL_INPUTS = {
+    "img-openers": "<img ",
+    "img-handlers": "<img on",
+    "svg-handlers": "<svg on",
+    "media-queries": "@media ",
+    "template-braces": "{{",
+    "event-words": "on",
+    "split-script": "scr",
+    "split-javascript": "java",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time detect_xss_patterns on pathological inputs of growing size. "
+        "Latency per KB should stay flat in linear mode."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=MODES,
+            help=f"Detector mode to time (repeatable, default: {MODE_LINEAR}).",
+        )
+        parser.add_argument(
+            "--min-size",
+            type=int,
+            default=1024,
+            help="Smallest input size in bytes (default: 1 KB).",
+        )
+        parser.add_argument(
+            "--max-size",
+            type=int,
+            default=4 * 1024 * 1024,
+            help="Largest input size in bytes (default: 4 MB). Keep this small "
+            "when timing compiled mode, which is quadratic on these inputs.",
+        )
+        parser.add_argument(
+            "--input",
+            action="append",
+            choices=sorted(PATHOLOGICAL_INPUTS),
+            help="Pathological input to use (repeatable, default: all).",
+        )
+
+    def handle(self, *args, **options):
+        modes = options["mode"] or [MODE_LINEAR]
+        inputs = options["input"] or list(PATHOLOGICAL_INPUTS)
+
+        sizes = []
+        size = options["min_size"]
+        while size <= options["max_size"]:
+            sizes.append(size)
+            size *= 4
+
+        self.stdout.write(
+            f"{'input':<18} {'mode':<9} {'size':>10} {'ms':>10} {'us/KB':>8}"
+        )
+        for name in inputs:
+            unit = PATHOLOGICAL_INPUTS[name]
+            for mode in modes:
+                for size in sizes:
+                    payload = unit * (size // len(unit))
+                    started = time.perf_counter()
+                    detect_xss_patterns(payload, mode=mode)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{name:<18} {mode:<9} {len(payload):>10} "
+                        f"{elapsed * 1e3:>10.2f} "
+                        f"{elapsed * 1e6 / (len(payload) / 1024):>8.1f}"
+                    )
@@ -0,0 +1,131 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from labs.xss.filters import FILTER_SETS, FilterSet
+
+PAYLOAD = "<img src=x onerror=alert()><script>eval()</script>"
+SENTENCE = "a harmless comment about the weather. "
+
+# Repeated to the size asked for: plain text, and text with a payload
+# every ~10 KB or every ~200 characters.
+INPUTS = {
+    "plain": SENTENCE,
+    "sparse": SENTENCE * 270 + PAYLOAD,
+    "dense": SENTENCE * 4 + PAYLOAD,
+}
+
+
+class _CountingFilterSet(FilterSet):
+    """A FilterSet that counts the characters its replacements copy."""
+
+    copied = 0
+    filtered_whole = False
+
+    def apply(self, text):
+        self.copied = 0
+        self._text = text
+        self.filtered_whole = False
+        return super().apply(text)
+
+    def _filter(self, text, blocked):
+        self.filtered_whole = self.filtered_whole or text is self._text
+        for index, (pattern, replacement) in enumerate(self.filters):
+            if pattern in text:
+                blocked.add(index)
+                text = text.replace(pattern, replacement)
+                self.copied += len(text)
+        return text
+
+
+def _sequential(filters, text):
+    # The loop FilterSet replaced: every filter scans and copies the comment.
+    blocked = []
+    copied = 0
+    for pattern, replacement in filters:
+        if pattern in text:
+            blocked.append(pattern)
+            text = text.replace(pattern, replacement)
+            copied += len(text)
+    return text, blocked, copied
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a lab's filter set applied by FilterSet against the filter-by-"
+        "filter loop it replaced, on comments of growing size; report the "
+        "characters each one copies and check that both give the same result."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lab",
+            default="filter_bypass",
+            choices=sorted(FILTER_SETS),
+            help="Lab whose filter set to apply (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--min-size",
+            type=int,
+            default=64 * 1024,
+            help="Smallest comment size in characters (default: 64 KB).",
+        )
+        parser.add_argument(
+            "--max-size",
+            type=int,
+            default=4 * 1024 * 1024,
+            help="Largest comment size in characters (default: 4 MB).",
+        )
+        parser.add_argument(
+            "--input",
+            action="append",
+            choices=sorted(INPUTS),
+            help="Comment to filter (repeatable, default: all).",
+        )
+
+    def handle(self, *args, **options):
+        filter_set = FILTER_SETS[options["lab"]]
+        counting = _CountingFilterSet(filter_set.filters)
+        inputs = options["input"] or list(INPUTS)
+
+        sizes = []
+        size = options["min_size"]
+        while size <= options["max_size"]:
+            sizes.append(size)
+            size *= 4
+
+        self.stdout.write(
+            f"{'input':<8} {'size':>9} {'loop ms':>9} {'set ms':>9} "
+            f"{'loop copied':>12} {'set copied':>11}"
+        )
+        for name in inputs:
+            unit = INPUTS[name]
+            for size in sizes:
+                text = unit * (size // len(unit))
+
+                started = time.perf_counter()
+                *expected, loop_copied = _sequential(filter_set.filters, text)
+                loop_elapsed = time.perf_counter() - started
+                started = time.perf_counter()
+                result = filter_set.apply(text)
+                elapsed = time.perf_counter() - started
+
+                if list(result) != expected:
+                    raise CommandError(
+                        f"FilterSet differs from the loop on {name} at "
+                        f"{len(text)} characters."
+                    )
+                filtered, _ = counting.apply(text)
+                copied = counting.copied
+                if filtered is not text and not counting.filtered_whole:
+                    # Joining the windows and the text between them.
+                    copied += len(filtered)
+                self.stdout.write(
+                    f"{name:<8} {len(text):>9} {loop_elapsed * 1e3:>9.2f} "
+                    f"{elapsed * 1e3:>9.2f} {loop_copied:>12} {copied:>11}"
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"FilterSet matched the loop on every input ({options['lab']})."
+            )
+        )
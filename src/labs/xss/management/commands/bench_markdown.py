@@ -0,0 +1,126 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from labs.xss import markdown
+
+WORDS = ("lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing")
+
+
+def _prose(size):
+    # Paragraphs of words with some bold words and links, like lab posts.
+    rnd = random.Random(size)
+    words = []
+    length = 0
+    while length < size:
+        word = rnd.choice(WORDS)
+        roll = rnd.random()
+        if roll < 0.05:
+            word = f"**{word}**"
+        elif roll < 0.08:
+            word = f"[{word}](https://example.com/{word})"
+        elif roll < 0.1:
+            word += ".\n\n"
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def _repeat(unit):
+    return lambda size: (unit * (size // len(unit) + 1))[:size]
+
+
+# Besides prose, lines of link openers that never close, which the
+# substitutions rescan from every opener.
+INPUTS = {
+    "prose": _prose,
+    "open-brackets": _repeat("[" * 255 + "\n"),
+    "unclosed-links": _repeat("[a](b " * 42 + "\n"),
+}
+
+
+def _substitutions(text):
+    # The renderer markdown.render() replaced.
+    text = re.sub(r"\*\*(.*?)\*\*", r"<strong>\1</strong>", text)
+    return re.sub(r"\[(.*?)\]\((.*?)\)", r'<a href="\2">\1</a>', text)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the Markdown XSS lab's renderer against the two regex "
+        "substitutions it replaced, on documents of growing size, and check "
+        "that both give the same HTML."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-size",
+            type=int,
+            default=64 * 1024,
+            help="Smallest document size in characters (default: 64 KB).",
+        )
+        parser.add_argument(
+            "--max-size",
+            type=int,
+            default=4 * 1024 * 1024,
+            help="Largest document size in characters (default: 4 MB).",
+        )
+        parser.add_argument(
+            "--max-substitution-size",
+            type=int,
+            default=256 * 1024,
+            help="Only time the substitutions up to this size on the "
+            "open-bracket inputs, where they are quadratic (default: 256 KB).",
+        )
+        parser.add_argument(
+            "--input",
+            action="append",
+            choices=sorted(INPUTS),
+            help="Document to render (repeatable, default: all).",
+        )
+
+    def handle(self, *args, **options):
+        inputs = options["input"] or list(INPUTS)
+
+        sizes = []
+        size = options["min_size"]
+        while size <= options["max_size"]:
+            sizes.append(size)
+            size *= 4
+
+        self.stdout.write(
+            f"{'input':<16} {'size':>10} {'re.sub ms':>10} {'render ms':>10} "
+            f"{'cached ms':>10}"
+        )
+        for name in inputs:
+            for size in sizes:
+                text = INPUTS[name](size)
+                baseline = "-"
+                expected = None
+                if name == "prose" or size <= options["max_substitution_size"]:
+                    started = time.perf_counter()
+                    expected = _substitutions(text)
+                    baseline = f"{(time.perf_counter() - started) * 1e3:.2f}"
+
+                markdown.render_cache.clear()
+                started = time.perf_counter()
+                rendered = markdown.render(text)
+                elapsed = time.perf_counter() - started
+                started = time.perf_counter()
+                markdown.render(text)
+                cached = time.perf_counter() - started
+
+                if expected is not None and rendered != expected:
+                    raise CommandError(
+                        f"render() differs from the substitutions on {name} "
+                        f"at {size} characters."
+                    )
+                self.stdout.write(
+                    f"{name:<16} {len(text):>10} {baseline:>10} "
+                    f"{elapsed * 1e3:>10.2f} {cached * 1e3:>10.2f}"
+                )
+        self.stdout.write(
+            self.style.SUCCESS("render() matched the substitutions on every input.")
+        )
@@ -0,0 +1,231 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+SERVERS = {
+    "wsgi": lambda port, workers: [
+        *("-m", "gunicorn", "core.wsgi:application"),
+        *("--bind", f"127.0.0.1:{port}", "--workers", str(workers)),
+        *("--log-level", "warning"),
+    ],
+    "asgi": lambda port, workers: [
+        *("-m", "uvicorn", "core.asgi:application"),
+        *("--port", str(port), "--log-level", "warning"),
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the site under gunicorn's sync workers with the sync views "
+        "(wsgi) and under uvicorn with XSS_ASYNC_VIEWS on (asgi), load both "
+        "with concurrent clients while some clients trickle slow uploads, and "
+        "report requests/s and tail latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server",
+            action="append",
+            choices=sorted(SERVERS),
+            help="Serving mode to benchmark (repeatable, default: both).",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            help=(
+                "Path to request, in turn with the others (repeatable, default: "
+                "the stored XSS and Content-Type labs)."
+            ),
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Clients sending requests back to back (default: 50).",
+        )
+        parser.add_argument(
+            "--slow-clients",
+            type=int,
+            default=3,
+            help=(
+                "Clients that trickle a file upload one byte every half second "
+                "for the whole run (default: 3, one per gunicorn worker)."
+            ),
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds to load each server for (default: 10).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=3,
+            help="gunicorn workers, as in the prod container (default: 3).",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=5.0,
+            help="Seconds before a request counts as an error (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        servers = options["server"] or list(SERVERS)
+        paths = options["path"] or [
+            reverse("xss:stored_basic"),
+            reverse("xss:content_type") + "?filename=image.svg",
+        ]
+
+        self.stdout.write(
+            f"{'server':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'max ms':>8} {'errors':>7}"
+        )
+        for server in servers:
+            port = _free_port()
+            with tempfile.TemporaryDirectory() as directory:
+                process = self._start(server, port, options["workers"], directory)
+                try:
+                    latencies, errors = asyncio.run(self._load(port, paths, options))
+                finally:
+                    process.terminate()
+                    process.wait()
+            latencies.sort()
+            count = len(latencies)
+            if not count:
+                self.stdout.write(f"{server:<8} no successful requests")
+                continue
+            self.stdout.write(
+                f"{server:<8} {count / options['duration']:>8.0f} "
+                + " ".join(
+                    f"{latencies[min(count - 1, count * q // 100)] * 1e3:>8.1f}"
+                    for q in (50, 95, 99)
+                )
+                + f" {latencies[-1] * 1e3:>8.1f} {errors:>7}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{options['concurrency']} clients and {options['slow_clients']} "
+                f"slow uploads for {options['duration']:g}s per server."
+            )
+        )
+
+    def _start(self, server, port, workers, directory):
+        # The server runs this project's settings with the views of its mode.
+        Path(directory, "bench_settings.py").write_text(
+            f"from {settings.SETTINGS_MODULE} import *  # noqa: F403\n"
+            f"XSS_ASYNC_VIEWS = {server == 'asgi'}\n"
+        )
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "bench_settings",
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [directory, os.environ.get("PYTHONPATH")])
+            ),
+        }
+        process = subprocess.Popen(
+            [sys.executable, *SERVERS[server](port, workers)],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"The {server} server exited on startup.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return process
+            except OSError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f"The {server} server did not start within 30 seconds.")
+
+    async def _load(self, port, paths, options):
+        latencies = []
+        errors = 0
+
+        async def client(offset, deadline):
+            nonlocal errors
+            turn = offset
+            while time.perf_counter() < deadline:
+                path = paths[turn % len(paths)]
+                turn += 1
+                started = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(
+                        _get(port, path), options["timeout"]
+                    )
+                except (OSError, TimeoutError):
+                    status = None
+                if status == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        upload_path = reverse("xss:file_upload_xss")
+        uploads_until = time.perf_counter() + options["duration"] + 1
+        slow = [
+            asyncio.create_task(_trickle_upload(port, upload_path, uploads_until))
+            for _ in range(options["slow_clients"])
+        ]
+        # Let the slow uploads take their seats first.
+        await asyncio.sleep(0.5)
+        deadline = time.perf_counter() + options["duration"]
+        await asyncio.gather(
+            *(client(i, deadline) for i in range(options["concurrency"]))
+        )
+        for task in slow:
+            task.cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+        return latencies, errors
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            "Connection: close\r\n\r\n".encode()
+        )
+        status_line = await reader.readline()
+        # Read the response to the end, as a browser would.
+        while await reader.read(65536):
+            pass
+        _, _, status = status_line.partition(b" ")
+        return int(status[:3] or 0)
+    finally:
+        writer.close()
+
+
+async def _trickle_upload(port, path, deadline):
+    _, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            "Content-Type: multipart/form-data; boundary=bench\r\n"
+            "Content-Length: 1000000\r\n\r\n".encode()
+        )
+        while time.perf_counter() < deadline:
+            writer.write(b"x")
+            await writer.drain()
+            await asyncio.sleep(0.5)
+    finally:
+        writer.close()
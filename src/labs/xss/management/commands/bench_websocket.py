@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from labs.xss.websocket import WEBSOCKET_PATH
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the WebSocket XSS backend of a running ASGI server: open "
+        "many subscribers in one room, publish messages at a fixed rate and "
+        "report delivered messages/s and fan-out latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default=f"ws://127.0.0.1:8000{WEBSOCKET_PATH}",
+            help="WebSocket endpoint (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=1000,
+            help="Subscribers to open (default: 1000).",
+        )
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=100,
+            help="Messages to publish (default: 100).",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=20.0,
+            help="Messages published per second (default: 20).",
+        )
+        parser.add_argument(
+            "--connect-concurrency",
+            type=int,
+            default=100,
+            help="Handshakes in flight at once (default: 100).",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=10.0,
+            help="Seconds to wait for stragglers after the last publish.",
+        )
+
+    def handle(self, *args, **options):
+        asyncio.run(self._bench(options))
+
+    async def _bench(self, options):
+        url = f"{options['url']}?room=bench-{uuid.uuid4().hex[:8]}"
+        expected = options["messages"]
+        latencies = []
+        last_delivery = 0.0
+        closed_by_server = 0
+        everyone_done = asyncio.Event()
+        pending_subscribers = options["connections"]
+
+        async def subscribe(ready, gate):
+            nonlocal closed_by_server, last_delivery, pending_subscribers
+            async with gate:
+                websocket = await connect(url, max_queue=None)
+            ready.set()
+            received = 0
+            try:
+                async for raw in websocket:
+                    message = json.loads(raw)
+                    latencies.append(time.time() - message["ts"])
+                    last_delivery = time.perf_counter()
+                    received += 1
+                    if received == expected:
+                        break
+            except ConnectionClosed:
+                closed_by_server += 1
+            finally:
+                await websocket.close()
+                pending_subscribers -= 1
+                if not pending_subscribers:
+                    everyone_done.set()
+
+        gate = asyncio.Semaphore(options["connect_concurrency"])
+        started = time.perf_counter()
+        readiness = []
+        subscribers = []
+        for _ in range(options["connections"]):
+            ready = asyncio.Event()
+            readiness.append(ready.wait())
+            subscribers.append(asyncio.create_task(subscribe(ready, gate)))
+        await asyncio.gather(*readiness)
+        self.stdout.write(
+            f"Opened {options['connections']} connections in "
+            f"{time.perf_counter() - started:.2f}s."
+        )
+
+        async def discard(websocket):
+            # The publisher is in the room too; if it stopped reading, the
+            # server would close it as a slow consumer.
+            async for _ in websocket:
+                pass
+
+        async with connect(url, max_queue=None) as publisher:
+            draining = asyncio.create_task(discard(publisher))
+            publish_started = time.perf_counter()
+            interval = 1 / options["rate"]
+            for sequence in range(expected):
+                await publisher.send(
+                    json.dumps({"user": "bench", "content": f"message {sequence}"})
+                )
+                await asyncio.sleep(
+                    max(
+                        0,
+                        publish_started
+                        + (sequence + 1) * interval
+                        - time.perf_counter(),
+                    )
+                )
+            try:
+                await asyncio.wait_for(everyone_done.wait(), options["timeout"])
+            except TimeoutError:
+                pass
+            draining.cancel()
+        # Subscribers that lost messages to a full queue wait out the
+        # timeout; the rate counts up to the last delivery only.
+        elapsed = max(last_delivery - publish_started, 1e-9)
+
+        for subscriber in subscribers:
+            subscriber.cancel()
+        await asyncio.gather(*subscribers, return_exceptions=True)
+
+        wanted = expected * options["connections"]
+        delivered = len(latencies)
+        latencies.sort()
+        self.stdout.write(
+            f"Published {expected} messages; delivered {delivered}/{wanted} "
+            f"({delivered / elapsed:.0f} messages/s), {wanted - delivered} "
+            f"undelivered, {closed_by_server} subscribers closed by the server."
+        )
+        if latencies:
+            percentiles = "  ".join(
+                f"p{q} {latencies[min(delivered - 1, delivered * q // 100)] * 1e3:.1f}"
+                for q in (50, 95, 99)
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Fan-out latency ms: {percentiles}  max {latencies[-1] * 1e3:.1f}"
+                )
+            )
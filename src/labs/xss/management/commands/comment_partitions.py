@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from labs.xss.models import Comment
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarise stored comments per partition (session or room): how many "
+        "each holds and when the first and last were posted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="Only show the N largest partitions.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the summary as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        partitions = list(Comment.objects.partition_summary()[: options["limit"]])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(partitions, indent=2, default=str))
+            return
+
+        self.stdout.write(f"{'partition':<24} {'comments':>9}  {'first':<16}  last")
+        for partition in partitions:
+            self.stdout.write(
+                f"{partition['partition'] or '(shared)':<24} "
+                f"{partition['comments']:>9}  "
+                f"{partition['first']:%Y-%m-%d %H:%M}  "
+                f"{partition['last']:%Y-%m-%d %H:%M}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{sum(p['comments'] for p in partitions)} comments in "
+                f"{len(partitions)} partitions."
+            )
+        )
@@ -0,0 +1,81 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from core.routers import LABS_DATABASE
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the XSS lab rows left in the default database, from before lab "
+        "data moved to its own database, into the labs database. Rows "
+        "already there (same id) are skipped, so the copy can be re-run. "
+        "Columns the old tables lack get their field defaults. The old "
+        "tables are left in place."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            default="default",
+            help="Database alias to copy from (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows copied per transaction (default: %(default)s).",
+        )
+
+    def handle(self, *args, **options):
+        source = connections[options["source"]]
+        batch_size = options["batch_size"]
+        tables = set(source.introspection.table_names())
+
+        for model in apps.get_app_config("xss").get_models():
+            table = model._meta.db_table
+            if table not in tables:
+                self.stdout.write(f"{table}: not in {source.alias}, skipped.")
+                continue
+            with source.cursor() as cursor:
+                columns = {
+                    column.name
+                    for column in source.introspection.get_table_description(
+                        cursor, table
+                    )
+                }
+            names = [
+                field.attname
+                for field in model._meta.concrete_fields
+                if field.column in columns
+            ]
+
+            rows = (
+                model._base_manager.using(source.alias)
+                .order_by("pk")
+                .values_list(*names)
+            )
+            pk_index = names.index(model._meta.pk.attname)
+            last_pk = None
+            read = copied = 0
+            while True:
+                page = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+                batch = list(page[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1][pk_index]
+                read += len(batch)
+                target = model._base_manager.using(LABS_DATABASE)
+                with transaction.atomic(using=LABS_DATABASE):
+                    before = target.count()
+                    target.bulk_create(
+                        [model(**dict(zip(names, row, strict=True))) for row in batch],
+                        ignore_conflicts=True,
+                    )
+                    copied += target.count() - before
+
+            self.stdout.write(
+                f"{table}: copied {copied} of {read} rows "
+                f"({read - copied} already in {LABS_DATABASE})."
+            )
+        self.stdout.write(self.style.SUCCESS("Lab data copied."))
@@ -0,0 +1,90 @@
+import json
+from itertools import chain
+
+from django.core.management.base import BaseCommand
+
+from labs.xss import detection
+from labs.xss.models import Comment
+
+SORT_KEYS = {
+    "matched": lambda check: check["matched"],
+    "evaluated": lambda check: check["evaluated"],
+    "time": lambda check: check["elapsed_ms"],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run payloads through the instrumented XSS detector and report, for "
+        "each pattern and literal, how often it was evaluated and matched "
+        "and the time spent on it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            action="append",
+            default=[],
+            help="Read payloads from this file, one per line (repeatable). "
+            "Stored comments are used when no file is given.",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=sorted(SORT_KEYS),
+            default="matched",
+            help="Column to sort by, descending (default: matched).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="Only show the top N checks.",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the statistics as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            payloads = chain.from_iterable(
+                self._read_lines(path) for path in options["file"]
+            )
+        else:
+            payloads = chain.from_iterable(
+                Comment.objects.values_list("name", "comment").iterator()
+            )
+
+        detection.reset_detector_stats()
+        scanned = flagged = 0
+        for payload in payloads:
+            scanned += 1
+            flagged += detection.detect_xss_patterns(
+                payload, mode=detection.MODE_INSTRUMENTED
+            )
+
+        checks = sorted(
+            detection.detector_stats(), key=SORT_KEYS[options["sort"]], reverse=True
+        )[: options["limit"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(checks, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'kind':<8} {'matched':>8} {'evaluated':>10} {'ms':>9}  source"
+        )
+        for check in checks:
+            self.stdout.write(
+                f"{check['kind']:<8} {check['matched']:>8} {check['evaluated']:>10} "
+                f"{check['elapsed_ms']:>9.2f}  {check['source']}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"{scanned} payloads checked, {flagged} flagged.")
+        )
+
+    @staticmethod
+    def _read_lines(path):
+        with open(path, encoding="utf-8", errors="replace") as lines:
+            for line in lines:
+                yield line.rstrip("\n")
@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from labs.xss.retention import purge_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored comments that break the retention policy, oldest "
+        "first, one bounded transaction at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-rows",
+            type=int,
+            default=settings.XSS_COMMENT_MAX_ROWS,
+            help="Keep only the newest N comments (default: "
+            "XSS_COMMENT_MAX_ROWS, 0 for no limit).",
+        )
+        parser.add_argument(
+            "--max-age-days",
+            type=int,
+            default=settings.XSS_COMMENT_MAX_AGE_DAYS,
+            help="Delete comments older than N days (default: "
+            "XSS_COMMENT_MAX_AGE_DAYS, 0 for no limit).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.XSS_COMMENT_PURGE_BATCH_SIZE,
+            help="Rows deleted per transaction (default: "
+            "XSS_COMMENT_PURGE_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between transactions, to let writers in.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["max_rows"] and not options["max_age_days"]:
+            raise CommandError(
+                "No retention limit set; pass --max-rows or --max-age-days."
+            )
+
+        total = batches = 0
+        started = time.perf_counter()
+        while True:
+            deleted = purge_batch(
+                max_rows=options["max_rows"],
+                max_age_days=options["max_age_days"],
+                batch_size=options["batch_size"],
+            )
+            if not deleted:
+                break
+            total += deleted
+            batches += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Deleted {deleted} comments.")
+            if options["pause"]:
+                time.sleep(options["pause"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {total} comments in {batches} transactions ({elapsed:.2f}s)."
+            )
+        )
@@ -0,0 +1,76 @@
+r"""
+Markdown rendering for the Markdown XSS lab.
+
+The lab's renderer is intentionally vulnerable: it supports ``**bold**``
+and ``[text](url)`` only, escapes nothing, and puts any URL (``javascript:``
+included) straight into the href. render() gives byte-for-byte the output
+of the two substitutions it replaces::
+
+    text = re.sub(r"\*\*(.*?)\*\*", r"<strong>\1</strong>", text)
+    text = re.sub(r"\[(.*?)\]\((.*?)\)", r'<a href="\2">\1</a>', text)
+
+The bold substitution is linear, so it stays a precompiled regex. The link
+substitution is not: on a line where a link never closes, it retries its
+lazy groups from every ``[`` to the end of the line, which is quadratic in
+the line length. Links are found with str.find instead, jumping from
+delimiter to delimiter. Neither rule crosses a newline (``.`` doesn't match
+one), and when an opener has no closers left on its line, no later opener
+on that line has any either, so the scan skips straight to the next line.
+
+Rendered documents are cached by content (see ``render_cache``).
+"""
+
+import re
+
+from .lru import LRUCache
+
+_BOLD = re.compile(r"\*\*(.*?)\*\*")
+
+render_cache = LRUCache(maxsize=32)
+
+
+def _links(text):
+    """Return (``[``, ``](``, ``)``) positions of each link of the link rule."""
+    links = []
+    pos = 0
+    line_end = -1
+    while (start := text.find("[", pos)) >= 0:
+        if start > line_end:
+            line_end = text.find("\n", start)
+            if line_end < 0:
+                line_end = len(text)
+        middle = text.find("](", start + 1, line_end)
+        end = text.find(")", middle + 2, line_end) if middle >= 0 else -1
+        if end < 0:
+            pos = line_end + 1
+            continue
+        links.append((start, middle, end))
+        pos = end + 1
+    return links
+
+
+def _render(text):
+    text = _BOLD.sub(r"<strong>\1</strong>", text)
+    parts = []
+    pos = 0
+    for start, middle, end in _links(text):
+        parts += (
+            text[pos:start],
+            '<a href="',
+            text[middle + 2 : end],
+            '">',
+            text[start + 1 : middle],
+            "</a>",
+        )
+        pos = end + 1
+    if not pos:
+        return text
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def render(text):
+    """Render the lab's Markdown subset to (unsanitized) HTML."""
+    if not text:
+        return text
+    return render_cache.get_or_compute(text, _render)
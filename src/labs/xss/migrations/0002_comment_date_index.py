@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("xss", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="comment",
+            name="date",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+    ]
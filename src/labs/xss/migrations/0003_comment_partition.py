@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("xss", "0002_comment_date_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="partition",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["partition", "date"], name="xss_comment_partition_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+"""
+Memoized MIME type guessing for the Content-Type XSS lab.
+
+guess_type() returns exactly what ``mimetypes.guess_type(filename)[0]``
+does. The extension table is copied once from the mimetypes database, so a
+plain ``name.ext`` costs one splitext and one dict lookup. Filenames that
+need the rest of guess_type's rules (URLs and data: URLs, compression
+suffixes like .gz, aliases like .tgz) go through mimetypes itself, with
+the answers kept in an LRU cache.
+"""
+
+import mimetypes
+import posixpath
+from functools import lru_cache
+
+mimetypes.init()
+TYPES = dict(mimetypes.types_map)
+_SUFFIXES = frozenset(mimetypes.suffix_map)
+_ENCODINGS = frozenset(mimetypes.encodings_map)
+
+
+def guess_type(filename):
+    """Return the MIME type for ``filename``, or None if it has no known type."""
+    # A colon may start a URL scheme; guess_type treats those differently.
+    if ":" not in filename:
+        ext = posixpath.splitext(filename)[1]
+        ext_lower = ext.lower()
+        if ext_lower not in _SUFFIXES and ext not in _ENCODINGS:
+            return TYPES.get(ext_lower)
+    return _guess_type(filename)
+
+
+@lru_cache(maxsize=1024)
+def _guess_type(filename):
+    return mimetypes.guess_type(filename)[0]
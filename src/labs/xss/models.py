@@ -2,6 +2,39 @@ from django.db import models
 from django.utils import timezone
 
 
+class CommentQuerySet(models.QuerySet):
+    def in_partition(self, partition):
+        """Comments of one partition, or all of them when ``partition`` is None."""
+        if partition is None:
+            return self
+        return self.filter(partition=partition)
+
+    def feed(self):
+        """Newest first, with the primary key breaking ties between dates."""
+        return self.order_by("-date", "-pk")
+
+    def older_than(self, date, pk):
+        """Comments that come after (date, pk) in feed order."""
+        return self.filter(date__lte=date).exclude(date=date, pk__gte=pk)
+
+    def newer_than(self, date, pk):
+        """Comments that come before (date, pk) in feed order."""
+        return self.filter(date__gte=date).exclude(date=date, pk__lte=pk)
+
+    def partition_summary(self):
+        """Per-partition comment counts and first/last dates, largest first."""
+        return (
+            self.order_by()
+            .values("partition")
+            .annotate(
+                comments=models.Count("pk"),
+                first=models.Min("date"),
+                last=models.Max("date"),
+            )
+            .order_by("-comments", "partition")
+        )
+
+
 class Comment(models.Model):
     """
     Model for storing user comments in the Stored XSS lab.
@@ -9,10 +42,22 @@ class Comment(models.Model):
 
     name = models.CharField(max_length=100)
     comment = models.TextField()
-    date = models.DateTimeField(default=timezone.now)
+    # Indexed for the keyset-paginated feed; the index carries the primary
+    # key, so (date, id) seeks are a single range scan.
+    date = models.DateTimeField(default=timezone.now, db_index=True)
+    # Session or room the comment was posted in when partitioning is on (see
+    # labs.xss.partitions); "" is the shared, unpartitioned feed.
+    partition = models.CharField(max_length=64, blank=True, default="")
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ["-date"]
+        indexes = [
+            models.Index(
+                fields=["partition", "date"], name="xss_comment_partition_date"
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.name} on {self.date.strftime('%Y-%m-%d %H:%M')}"
@@ -0,0 +1,61 @@
+"""
+Partitioned comment spaces for the stored XSS lab.
+
+XSS_COMMENT_PARTITIONING chooses whose comments a stored_basic page shows:
+
+- "off": everyone shares one feed (the original behaviour).
+- "session": every browser gets a private feed, keyed by a random id.
+- "room": browsers that joined the same room (?room=<name>, remembered
+  afterwards) share a feed; without a room they use the shared one.
+
+The partition key travels in a signed cookie. Each page then reads a
+handful of rows through the (partition, date) index, however many trainees
+are posting; Comment.objects.partition_summary() still aggregates across
+all of them for instructors.
+"""
+
+import re
+
+from django.conf import settings
+from django.utils.crypto import get_random_string
+
+MODE_OFF = "off"
+MODE_SESSION = "session"
+MODE_ROOM = "room"
+MODES = (MODE_OFF, MODE_SESSION, MODE_ROOM)
+
+PARTITION_COOKIE = "xss_partition"
+
+_ROOM_NAME = re.compile(r"[\w-]{1,64}", re.ASCII)
+
+
+def resolve(request):
+    """
+    Return ``(partition, new_partition)`` for ``request``.
+
+    ``partition`` is None when partitioning is off. ``new_partition`` is set
+    when the response has to remember a new key with remember().
+    """
+    mode = settings.XSS_COMMENT_PARTITIONING
+    if mode == MODE_OFF:
+        return None, None
+
+    current = request.get_signed_cookie(
+        PARTITION_COOKIE, default=None, salt=PARTITION_COOKIE
+    )
+    if mode == MODE_ROOM:
+        room = request.GET.get("room")
+        if room is not None and _ROOM_NAME.fullmatch(room) and room != current:
+            return room, room
+        return current or "", None
+
+    if current:
+        return current, None
+    partition = get_random_string(22)
+    return partition, partition
+
+
+def remember(response, partition):
+    response.set_signed_cookie(
+        PARTITION_COOKIE, partition, salt=PARTITION_COOKIE, httponly=True
+    )
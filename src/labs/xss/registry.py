@@ -0,0 +1,108 @@
+"""
+Registry of the XSS labs, loaded once from labs.yaml at import time.
+
+Everything derived from it (per-lab page context, dashboard grouping and
+totals) is computed here up front and frozen, so building a view's context
+is a dictionary lookup plus a shallow copy.
+"""
+
+from pathlib import Path
+from types import MappingProxyType
+
+import yaml
+from django.core.exceptions import ImproperlyConfigured
+
+REGISTRY_FILE = Path(__file__).with_name("labs.yaml")
+
+LAB_FIELDS = ("slug", "path", "title", "difficulty", "description", "hints")
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def load_registry(path=REGISTRY_FILE):
+    """Read and validate the registry file, returning frozen mappings."""
+    with open(path, encoding="utf-8") as registry_file:
+        data = yaml.safe_load(registry_file)
+
+    difficulties = {entry["key"]: entry for entry in data["difficulties"]}
+    seen = set()
+    for lab in data["labs"]:
+        missing = [field for field in LAB_FIELDS if field not in lab]
+        if missing:
+            raise ImproperlyConfigured(
+                f"Lab {lab.get('slug', '?')!r} in {path} is missing {missing}"
+            )
+        if lab["difficulty"] not in difficulties:
+            raise ImproperlyConfigured(
+                f"Lab {lab['slug']!r} has unknown difficulty {lab['difficulty']!r}"
+            )
+        if lab["slug"] in seen:
+            raise ImproperlyConfigured(f"Lab {lab['slug']!r} is defined twice")
+        seen.add(lab["slug"])
+
+    return _freeze(difficulties), _freeze(data["labs"])
+
+
+def _lab_context(lab):
+    context = {
+        "lab_title": lab["title"],
+        "difficulty": lab["difficulty"],
+        "lab_description": lab["description"],
+        "next_lab_url": lab.get("next_lab_url"),
+        "hints": lab["hints"],
+    }
+    if "success_message" in lab:
+        context["success_message"] = lab["success_message"]
+    return MappingProxyType(context)
+
+
+def _dashboard_context(difficulties, labs):
+    groups = tuple(
+        MappingProxyType(
+            {
+                **difficulty,
+                "labs": tuple(lab for lab in labs if lab["difficulty"] == key),
+            }
+        )
+        for key, difficulty in difficulties.items()
+    )
+    by_key = {group["key"]: group["labs"] for group in groups}
+    return MappingProxyType(
+        {
+            "lab_title": "XSS Labs Dashboard",
+            "labs": labs,
+            "groups": groups,
+            "beginner_labs": by_key.get("BEGINNER", ()),
+            "intermediate_labs": by_key.get("INTERMEDIATE", ()),
+            "advanced_labs": by_key.get("ADVANCED", ()),
+            "total_labs": len(labs),
+            "estimated_total_time": sum(
+                group["minutes"] * len(group["labs"]) for group in groups
+            )
+            // len(labs)
+            if labs
+            else 0,
+        }
+    )
+
+
+DIFFICULTIES, LABS = load_registry()
+LABS_BY_SLUG = MappingProxyType({lab["slug"]: lab for lab in LABS})
+LAB_CONTEXTS = MappingProxyType({lab["slug"]: _lab_context(lab) for lab in LABS})
+DASHBOARD_CONTEXT = _dashboard_context(DIFFICULTIES, LABS)
+
+
+def lab_context(slug, **extra):
+    """Return a fresh template context for a lab page, plus ``extra``."""
+    return {**LAB_CONTEXTS[slug], **extra}
+
+
+def dashboard_context():
+    """Return a fresh template context for the dashboard."""
+    return dict(DASHBOARD_CONTEXT)
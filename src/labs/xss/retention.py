@@ -0,0 +1,105 @@
+"""
+Retention policy for stored XSS comments.
+
+XSS_COMMENT_MAX_ROWS keeps only the newest N comments and
+XSS_COMMENT_MAX_AGE_DAYS drops comments older than that; 0 disables either
+limit. Excess comments are deleted oldest first, in batches of
+XSS_COMMENT_PURGE_BATCH_SIZE rows per transaction, so the write lock is only
+ever held for one short DELETE. Both limits are located through the index
+on Comment.date.
+
+Requests never wait for this. Every XSS_COMMENT_PURGE_INTERVAL inserts the
+pruner runs one batch on its own background thread; the purge_comments
+command trims a backlog in one go.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .models import Comment
+
+
+def _expired_ids(max_age_days, batch_size):
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    return Comment.objects.filter(date__lt=cutoff).order_by("date", "pk")[:batch_size]
+
+
+def _excess_ids(max_rows, batch_size):
+    # The newest comment past the cap; it and everything older goes.
+    boundary = Comment.objects.feed().values_list("date", "pk")[max_rows : max_rows + 1]
+    boundary = boundary.first()
+    if boundary is None:
+        return Comment.objects.none()
+    date, pk = boundary
+    return (
+        Comment.objects.filter(date__lte=date)
+        .exclude(date=date, pk__gt=pk)
+        .order_by("date", "pk")[:batch_size]
+    )
+
+
+def purge_batch(max_rows=None, max_age_days=None, batch_size=None):
+    """
+    Delete at most ``batch_size`` comments that break the policy, in one
+    transaction, and return how many were deleted. Arguments default to the
+    XSS_COMMENT_* settings.
+    """
+    max_rows = settings.XSS_COMMENT_MAX_ROWS if max_rows is None else max_rows
+    if max_age_days is None:
+        max_age_days = settings.XSS_COMMENT_MAX_AGE_DAYS
+    batch_size = batch_size or settings.XSS_COMMENT_PURGE_BATCH_SIZE
+
+    with transaction.atomic(using=router.db_for_write(Comment)):
+        deleted = 0
+        if max_age_days:
+            ids = list(
+                _expired_ids(max_age_days, batch_size).values_list("pk", flat=True)
+            )
+            deleted += Comment.objects.filter(pk__in=ids).delete()[0]
+        if max_rows and deleted < batch_size:
+            ids = list(
+                _excess_ids(max_rows, batch_size - deleted).values_list("pk", flat=True)
+            )
+            deleted += Comment.objects.filter(pk__in=ids).delete()[0]
+    return deleted
+
+
+class Pruner:
+    """Runs a purge batch in the background every ``interval`` inserts."""
+
+    def __init__(self, interval=100):
+        self.interval = interval
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pruner")
+        self._running = None
+
+    def note_inserts(self, count=1):
+        if not self.interval or not (
+            settings.XSS_COMMENT_MAX_ROWS or settings.XSS_COMMENT_MAX_AGE_DAYS
+        ):
+            return
+        with self._lock:
+            self._inserts += count
+            if self._inserts < self.interval:
+                return
+            if self._running is not None and not self._running.done():
+                # A batch is already on its way; it will see these rows too.
+                return
+            self._inserts = 0
+            self._running = self._executor.submit(self._prune)
+
+    @staticmethod
+    def _prune():
+        try:
+            return purge_batch()
+        finally:
+            connections.close_all()
+
+
+pruner = Pruner()
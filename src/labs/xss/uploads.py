@@ -0,0 +1,182 @@
+"""
+Streaming upload processing for the File Upload XSS lab.
+
+An upload is never held in memory whole. Django's upload handlers spool
+anything above FILE_UPLOAD_MAX_MEMORY_SIZE to a temporary file; the size
+cap handler installed ahead of them stops reading the request as soon as a
+file passes XSS_UPLOAD_MAX_SIZE bytes. The stored file is then decoded as
+UTF-8 one chunk at a time, keeping only the first XSS_UPLOAD_PREVIEW_CHARS
+characters for the page, so the memory a request needs doesn't grow with
+the size of the file.
+
+Uploads are kept in a content-addressed store: a file is named by the
+SHA-256 of its content, so the payload files trainees upload over and over
+are stored once, and their previews are decoded once per worker. Stored
+files are served from the stored_upload endpoint with the digest as a
+strong ETag. The store keeps at most XSS_UPLOAD_STORE_MAX_FILES files and
+drops the least recently uploaded ones first.
+"""
+
+import codecs
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+class SizeCapUploadHandler(FileUploadHandler):
+    """Aborts the upload once a file passes ``max_size`` bytes."""
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size
+        self.exceeded = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            self.exceeded = True
+            # Don't read the rest of the body either.
+            raise StopUpload(connection_reset=True)
+        # Hand the chunk on to the handlers that store it.
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def cap_upload_size(request, max_size=None):
+    """
+    Install a SizeCapUploadHandler on ``request`` and return it. Must run
+    before anything reads request.POST or request.FILES, CSRF checking
+    included.
+    """
+    handler = SizeCapUploadHandler(request, max_size or settings.XSS_UPLOAD_MAX_SIZE)
+    request.upload_handlers.insert(0, handler)
+    return handler
+
+
+def read_preview(uploaded_file, max_chars=None):
+    """
+    Decode ``uploaded_file`` as UTF-8, chunk by chunk, and return
+    ``(preview, truncated)``: its first ``max_chars`` characters and whether
+    there were more. The whole file is decoded, so invalid UTF-8 anywhere in
+    it raises UnicodeDecodeError.
+    """
+    max_chars = max_chars or settings.XSS_UPLOAD_PREVIEW_CHARS
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    preview = []
+    room = max_chars
+    truncated = False
+    for chunk in uploaded_file.chunks():
+        text = decoder.decode(chunk)
+        if len(text) > room:
+            truncated = True
+        if room:
+            preview.append(text[:room])
+            room -= len(preview[-1])
+    # Raises if the file ends inside a multi-byte character.
+    decoder.decode(b"", final=True)
+    return "".join(preview), truncated
+
+
+class UploadStore:
+    """Uploaded files on disk, named by the SHA-256 of their content."""
+
+    def __init__(self, root=None, max_files=1000, preview_cache_size=128):
+        self.root = Path(root) if root else None
+        self.max_files = max_files
+        self.preview_cache_size = preview_cache_size
+        self._previews = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, root, max_files):
+        self.root = Path(root)
+        self.max_files = max_files
+
+    def path(self, digest):
+        """Return where the file with ``digest`` lives; ValueError if malformed."""
+        if not _DIGEST.fullmatch(digest):
+            raise ValueError(f"Invalid upload digest: {digest!r}")
+        return self.root / digest[:2] / digest
+
+    def save(self, uploaded_file):
+        """
+        Store ``uploaded_file`` unless an identical file is stored already.
+        Return ``(digest, created)``.
+        """
+        # Hash first: a file that is already stored is never written again.
+        hasher = hashlib.sha256()
+        for chunk in uploaded_file.chunks():
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            # Uploading it again makes it the most recent.
+            os.utime(path)
+            return digest, False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name and renamed into place, so a
+        # concurrent reader never sees half a file.
+        with tempfile.NamedTemporaryFile(
+            dir=self.root, prefix=".upload-", delete=False
+        ) as temp:
+            for chunk in uploaded_file.chunks():
+                temp.write(chunk)
+        os.replace(temp.name, path)
+        self._prune()
+        return digest, True
+
+    def preview(self, digest):
+        """
+        Return ``(preview, truncated)`` for a stored file, as read_preview()
+        does, or None if it isn't UTF-8 text. Content never changes under a
+        digest, so results are cached.
+        """
+        with self._lock:
+            if digest in self._previews:
+                self._previews.move_to_end(digest)
+                return self._previews[digest]
+
+        with open(self.path(digest), "rb") as stored:
+            try:
+                result = read_preview(File(stored))
+            except UnicodeDecodeError:
+                result = None
+
+        with self._lock:
+            self._previews[digest] = result
+            if len(self._previews) > self.preview_cache_size:
+                self._previews.popitem(last=False)
+        return result
+
+    def _prune(self):
+        if not self.max_files:
+            return
+        stored = [
+            entry
+            for shard in os.scandir(self.root)
+            if shard.is_dir()
+            for entry in os.scandir(shard.path)
+        ]
+        if len(stored) <= self.max_files:
+            return
+        stored.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in stored[: len(stored) - self.max_files]:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                # Pruned by another worker at the same time.
+                pass
+
+
+store = UploadStore()
@@ -1,346 +1,41 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render
-from django.http import HttpResponse
-import mimetypes
-import re
-
-
-def detect_xss_patterns(content):
-    """
-    Check if content contains XSS patterns.
-    Returns True if patterns found, False otherwise.
-    """
-    if not content or not isinstance(content, str):
-        return False
-
-    content_lower = content.lower()
-
-    # XSS pattern list
-    xss_patterns = [
-        # Script tags
-        r"<script[\s\S]*?>",
-        r"</script>",
-        r"<script[\s\S]*?/>",
-        # Event handlers
-        r"on\w+\s*=",
-        r"onabort\s*=",
-        r"onblur\s*=",
-        r"onchange\s*=",
-        r"onclick\s*=",
-        r"ondblclick\s*=",
-        r"onerror\s*=",
-        r"onfocus\s*=",
-        r"onkeydown\s*=",
-        r"onkeypress\s*=",
-        r"onkeyup\s*=",
-        r"onload\s*=",
-        r"onmousedown\s*=",
-        r"onmousemove\s*=",
-        r"onmouseout\s*=",
-        r"onmouseover\s*=",
-        r"onmouseup\s*=",
-        r"onreset\s*=",
-        r"onresize\s*=",
-        r"onselect\s*=",
-        r"onsubmit\s*=",
-        r"onunload\s*=",
-        r"oncontextmenu\s*=",
-        r"ondrag\s*=",
-        r"ondrop\s*=",
-        # JavaScript URLs
-        r"javascript\s*:",
-        r"vbscript\s*:",
-        r"data\s*:\s*text/html",
-        r"data\s*:\s*application/javascript",
-        # Dangerous HTML tags
-        r"<iframe[\s\S]*?>",
-        r"<object[\s\S]*?>",
-        r"<embed[\s\S]*?>",
-        r"<applet[\s\S]*?>",
-        r"<meta[\s\S]*?>",
-        r"<link[\s\S]*?>",
-        r"<style[\s\S]*?>",
-        r"<base[\s\S]*?>",
-        # Image with event handlers
-        r"<img[\s\S]*?on\w+[\s\S]*?>",
-        r"<svg[\s\S]*?on\w+[\s\S]*?>",
-        # Form elements with events
-        r"<input[\s\S]*?on\w+[\s\S]*?>",
-        r"<button[\s\S]*?on\w+[\s\S]*?>",
-        r"<textarea[\s\S]*?on\w+[\s\S]*?>",
-        r"<select[\s\S]*?on\w+[\s\S]*?>",
-        # JavaScript functions
-        r"alert\s*\(",
-        r"confirm\s*\(",
-        r"prompt\s*\(",
-        r"eval\s*\(",
-        r"settimeout\s*\(",
-        r"setinterval\s*\(",
-        r"function\s*\(",
-        # DOM manipulation
-        r"document\.",
-        r"window\.",
-        r"location\.",
-        r"\.innerhtml",
-        r"\.outerhtml",
-        r"\.write\s*\(",
-        r"\.writeln\s*\(",
-        # CSS expressions
-        r"expression\s*\(",
-        r"behavior\s*:",
-        r"-moz-binding",
-        r"@import",
-        # Template injection patterns
-        r"\{\{[\s\S]*?\}\}",
-        r"\$\{[\s\S]*?\}",
-        r"<%[\s\S]*?%>",
-        # Encoded patterns
-        r"&#x?\d+;",
-        r"%3c%73%63%72%69%70%74",  # URL encoded <script
-        r"&lt;script",
-        r"&lt;img",
-        r"\\u[0-9a-f]{4}",  # Unicode encoding
-        # Data URIs
-        r"data:[\w/]+;base64,",
-        # XML/XHTML patterns
-        r"<\?xml[\s\S]*?\?>",
-        r"<!doctype[\s\S]*?>",
-        r"<!\[cdata\[",
-        # Common bypass attempts
-        r"scr\w*ipt",  # Like "scr" + something + "ipt"
-        r"java\w*script",  # Like "java" + something + "script"
-        r"vb\w*script",
-        # HTML5 specific
-        r"<audio[\s\S]*?on\w+[\s\S]*?>",
-        r"<video[\s\S]*?on\w+[\s\S]*?>",
-        r"<canvas[\s\S]*?on\w+[\s\S]*?>",
-        r"<details[\s\S]*?on\w+[\s\S]*?>",
-        # Form action manipulation
-        r"formaction\s*=",
-        r'action\s*=\s*["\']javascript:',
-        # CSS injection
-        r"@media[\s\S]*?\{",
-        r"@keyframes[\s\S]*?\{",
-        # WebRTC and other modern APIs
-        r"navigator\.",
-        r"geolocation\.",
-        r"webkitrtc",
-        r"mozrtc",
-    ]
-
-    # Check each pattern
-    for pattern in xss_patterns:
-        if re.search(pattern, content_lower, re.IGNORECASE | re.MULTILINE):
-            return True
-
-    # Additional checks for common XSS vectors
-    dangerous_strings = [
-        "javascript:",
-        "vbscript:",
-        "data:text/html",
-        "onload=",
-        "onerror=",
-        "onclick=",
-        "onmouseover=",
-        "alert(",
-        "confirm(",
-        "prompt(",
-        "eval(",
-        "document.cookie",
-        "document.write",
-        "window.location",
-        "innerHTML",
-        "outerHTML",
-        "insertAdjacentHTML",
-        "setTimeout",
-        "setInterval",
-        "Function(",
-        "constructor",
-        "prototype",
-        "__proto__",
-        "expression(",
-        "behavior:",
-        "-moz-binding",
-        "import",
-        "url(",
-        "@import",
-        "script:",
-        "about:",
-        "chrome:",
-        "resource:",
-        "moz-icon:",
-        "ms-its:",
-        "mk:",
-        "wyciwyg:",
-        "jar:",
-        "view-source:",
-        "gopher:",
-        "finger:",
-        "feed:",
-        "pcast:",
-        "webcal:",
-        "wyciwyg:",
-    ]
-
-    for dangerous in dangerous_strings:
-        if dangerous in content_lower:
-            return True
-
-    return False
-
-
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+import hashlib
+import time
+
+from core.file_responses import file_response
+from core.response_cache import cache_response
+
+from . import (
+    detection,
+    filters,
+    ingest,
+    markdown,
+    pagination,
+    partitions,
+    mime,
+    registry,
+    retention,
+    uploads,
+    websocket,
+)
+from .detection import detect_xss_patterns  # noqa: F401
+
+
+@cache_response
 def dashboard(request):
     """
     View for the XSS labs dashboard page.
     Lists all available XSS labs with descriptions and difficulty levels.
     """
-    labs = [
-        {
-            "name": "Basic Reflected XSS",
-            "url": "reflected_basic",
-            "difficulty": "BEGINNER",
-            "description": "Learn the fundamentals of reflected XSS through form input.",
-            "icon": "arrow-right-left",
-            "estimated_time": "10 minutes",
-        },
-        {
-            "name": "URL Parameter XSS",
-            "url": "url_parameter",
-            "difficulty": "BEGINNER",
-            "description": "Exploit XSS vulnerabilities through URL parameters.",
-            "icon": "link",
-            "estimated_time": "10 minutes",
-        },
-        {
-            "name": "Form Input XSS",
-            "url": "form_input",
-            "difficulty": "BEGINNER",
-            "description": "Discover XSS in form input processing.",
-            "icon": "edit",
-            "estimated_time": "10 minutes",
-        },
-        {
-            "name": "Basic Stored XSS",
-            "url": "stored_basic",
-            "difficulty": "BEGINNER",
-            "description": "Understand persistent XSS through database storage.",
-            "icon": "database",
-            "estimated_time": "15 minutes",
-        },
-        {
-            "name": "Simple DOM XSS",
-            "url": "dom_basic",
-            "difficulty": "BEGINNER",
-            "description": "Learn client-side XSS through DOM manipulation.",
-            "icon": "code",
-            "estimated_time": "15 minutes",
-        },
-        {
-            "name": "HTML Attribute XSS",
-            "url": "attribute",
-            "difficulty": "INTERMEDIATE",
-            "description": "Exploit XSS within HTML attribute contexts.",
-            "icon": "tag",
-            "estimated_time": "20 minutes",
-        },
-        {
-            "name": "JavaScript Context XSS",
-            "url": "js_context",
-            "difficulty": "INTERMEDIATE",
-            "description": "Break out of JavaScript string contexts.",
-            "icon": "terminal",
-            "estimated_time": "20 minutes",
-        },
-        {
-            "name": "SVG XSS",
-            "url": "svg_xss",
-            "difficulty": "INTERMEDIATE",
-            "description": "Exploit XSS through SVG file handling.",
-            "icon": "image",
-            "estimated_time": "20 minutes",
-        },
-        {
-            "name": "Markdown XSS",
-            "url": "markdown_xss",
-            "difficulty": "INTERMEDIATE",
-            "description": "Attack through vulnerable Markdown parsing.",
-            "icon": "file-text",
-            "estimated_time": "25 minutes",
-        },
-        {
-            "name": "AJAX/JSON XSS",
-            "url": "ajax_json",
-            "difficulty": "INTERMEDIATE",
-            "description": "Exploit XSS in AJAX responses and JSON handling.",
-            "icon": "refresh-cw",
-            "estimated_time": "25 minutes",
-        },
-        {
-            "name": "Filter Bypass XSS",
-            "url": "filter_bypass",
-            "difficulty": "ADVANCED",
-            "description": "Bypass common XSS protection mechanisms.",
-            "icon": "shield-off",
-            "estimated_time": "30 minutes",
-        },
-        {
-            "name": "Content-Type XSS",
-            "url": "content_type",
-            "difficulty": "ADVANCED",
-            "description": "Exploit MIME type confusion vulnerabilities.",
-            "icon": "file-type",
-            "estimated_time": "30 minutes",
-        },
-        {
-            "name": "Template Injection",
-            "url": "template",
-            "difficulty": "ADVANCED",
-            "description": "Advanced template injection attacks.",
-            "icon": "layout",
-            "estimated_time": "35 minutes",
-        },
-        {
-            "name": "WebSocket XSS",
-            "url": "websocket_xss",
-            "difficulty": "ADVANCED",
-            "description": "Real-time XSS through WebSocket messages.",
-            "icon": "wifi",
-            "estimated_time": "30 minutes",
-        },
-        {
-            "name": "File Upload XSS",
-            "url": "file_upload_xss",
-            "difficulty": "ADVANCED",
-            "description": "XSS through file upload functionality.",
-            "icon": "upload",
-            "estimated_time": "25 minutes",
-        },
-    ]
-
-    # Group labs by difficulty
-    beginner_labs = [lab for lab in labs if lab["difficulty"] == "BEGINNER"]
-    intermediate_labs = [lab for lab in labs if lab["difficulty"] == "INTERMEDIATE"]
-    advanced_labs = [lab for lab in labs if lab["difficulty"] == "ADVANCED"]
-
-    context = {
-        "lab_title": "XSS Labs Dashboard",
-        "labs": labs,
-        "beginner_labs": beginner_labs,
-        "intermediate_labs": intermediate_labs,
-        "advanced_labs": advanced_labs,
-        "total_labs": len(labs),
-        "estimated_total_time": sum(
-            [
-                10 * len(beginner_labs),
-                22 * len(intermediate_labs),
-                30 * len(advanced_labs),
-            ]
-        )
-        // len(labs)
-        if labs
-        else 0,
-    }
-
-    return render(request, "labs/xss/dashboard.html", context)
+    return render(request, "labs/xss/dashboard.html", registry.dashboard_context())
 
 
 # XSS lab views
@@ -352,98 +47,20 @@ def reflected_basic(request):
     elif request.GET.get("name"):
         user_name = request.GET.get("name", "")
 
-    context = {
-        "lab_title": "Basic Reflected XSS",
-        "difficulty": "BEGINNER",
-        "lab_description": "Simple form that reflects user input without sanitization. Inject JavaScript that executes when displayed.",
-        "next_lab_url": "/labs/xss/url-parameter/",
-        "user_name": user_name,
-        "hints": [
-            {
-                "title": "Check Input Handling",
-                "content": "User input inserted directly into HTML without filtering.",
-            },
-            {
-                "title": "HTML Tags Work",
-                "content": "HTML tags in name field get rendered by browser.",
-            },
-            {
-                "title": "Need Execution",
-                "content": "JavaScript must actually run - look for alert popup.",
-            },
-            {
-                "title": "Common Payloads",
-                "content": "Try: <script>alert(1)</script>, <img src=x onerror=alert(1)>, <svg onload=alert(1)>",
-            },
-            {
-                "title": "Event Handlers",
-                "content": "Use HTML event handlers like onerror, onload, onmouseover, onclick to trigger JavaScript execution.",
-            },
-            {
-                "title": "Solution",
-                "content": "Enter: <script>alert('XSS Success!')</script> and you should see a popup appear.",
-            },
-        ],
-    }
+    context = registry.lab_context("reflected_basic", user_name=user_name)
     return render(request, "labs/xss/reflected_basic.html", context)
 
 
 def url_parameter(request):
     search_query = request.GET.get("search", "")
 
-    context = {
-        "lab_title": "URL Parameter XSS",
-        "difficulty": "BEGINNER",
-        "lab_description": "URL parameters reflected in page content without sanitization.",
-        "next_lab_url": "/labs/xss/form-input/",
-        "search_query": search_query,
-        "hints": [
-            {
-                "title": "URL Parameters",
-                "content": "Look at how URL parameters are processed and displayed on the page.",
-            },
-            {
-                "title": "Direct Injection",
-                "content": "Try adding XSS payloads directly to the URL parameters.",
-            },
-            {
-                "title": "Execution Required",
-                "content": "Success is only achieved when JavaScript executes and shows an alert popup.",
-            },
-            {
-                "title": "Common Payloads",
-                "content": "Try: ?search=<script>alert(1)</script> or ?search=<img src=x onerror=alert(1)>",
-            },
-            {
-                "title": "Solution",
-                "content": "Add ?search=<script>alert('XSS Success!')</script> to the URL and see the popup.",
-            },
-        ],
-    }
+    context = registry.lab_context("url_parameter", search_query=search_query)
     return render(request, "labs/xss/url_parameter.html", context)
 
 
+@cache_response(csrf_cookie=True)
 def form_input(request):
-    context = {
-        "lab_title": "Form Input XSS",
-        "difficulty": "BEGINNER",
-        "lab_description": "Form input processing without validation - multiple injection points.",
-        "next_lab_url": "/labs/xss/stored-basic/",
-        "hints": [
-            {
-                "title": "Form Processing",
-                "content": "Examine how form inputs are processed and displayed.",
-            },
-            {
-                "title": "Input Validation",
-                "content": "Notice the lack of input validation on form fields.",
-            },
-            {
-                "title": "Solution",
-                "content": "Enter <script>alert('XSS')</script> in the form field.",
-            },
-        ],
-    }
+    context = registry.lab_context("form_input")
     return render(request, "labs/xss/form_input.html", context)
 
 
@@ -454,158 +71,194 @@ def stored_basic(request):
     """
     from .models import Comment
 
+    writer = ingest.get_writer(request)
+    new_writer = None
+    partition, new_partition = partitions.resolve(request)
+
     # Handle comment submission
     if request.method == "POST":
         name = request.POST.get("name")
         comment_text = request.POST.get("comment")
 
         if name and comment_text:
-            Comment.objects.create(name=name, comment=comment_text)
-
-    # Get all comments to display
-    comments = Comment.objects.all()
-
-    context = {
-        "lab_title": "Basic Stored XSS",
-        "difficulty": "BEGINNER",
-        "lab_description": "Persistent XSS stored in database - payload executes for all visitors.",
-        "next_lab_url": "/labs/xss/dom-basic/",
-        "hints": [
-            {
-                "title": "Persistent Storage",
-                "content": "Payload stored in database - executes for every visitor.",
-            },
-            {
-                "title": "Multiple Fields",
-                "content": "Both name and comment fields accept HTML input.",
-            },
-            {
-                "title": "Script Tags",
-                "content": "Use <script> tags - stored and executed for all users.",
-            },
-            {
-                "title": "Solution",
-                "content": "Enter the following in the comment field: <script>alert('XSS')</script>",
-            },
-        ],
-        "comments": comments,
-    }
+            if settings.XSS_COMMENT_WRITE_BEHIND:
+                if writer is None:
+                    writer = new_writer = ingest.new_writer()
+                ingest.comment_buffer.add(
+                    writer, name, comment_text, partition=partition or ""
+                )
+            else:
+                Comment.objects.create(
+                    name=name, comment=comment_text, partition=partition or ""
+                )
+                retention.pruner.note_inserts()
+
+    pending = _pending_comments(writer, partition)
+    # Only the newest page is rendered; older ones load from stored_basic_older
+    # and newer ones from stored_basic_since
+    comments, next_cursor = pagination.comment_page(partition=partition)
+    return _render_stored_basic(
+        request, comments, next_cursor, pending, new_writer, new_partition
+    )
+
+
+async def stored_basic_async(request):
+    """
+    Async variant of stored_basic, used under ASGI with XSS_ASYNC_VIEWS on.
+    A post waiting for the SQLite write lock doesn't hold up other requests.
+    """
+    from .models import Comment
+
+    writer = ingest.get_writer(request)
+    new_writer = None
+    partition, new_partition = partitions.resolve(request)
+
+    if request.method == "POST":
+        name = request.POST.get("name")
+        comment_text = request.POST.get("comment")
+
+        if name and comment_text:
+            if settings.XSS_COMMENT_WRITE_BEHIND:
+                if writer is None:
+                    writer = new_writer = ingest.new_writer()
+                # The call that fills the buffer also flushes it
+                await sync_to_async(ingest.comment_buffer.add)(
+                    writer, name, comment_text, partition=partition or ""
+                )
+            else:
+                await Comment.objects.acreate(
+                    name=name, comment=comment_text, partition=partition or ""
+                )
+                retention.pruner.note_inserts()
+
+    pending = _pending_comments(writer, partition)
+    comments, next_cursor = await pagination.acomment_page(partition=partition)
+    return _render_stored_basic(
+        request, comments, next_cursor, pending, new_writer, new_partition
+    )
+
+
+def _pending_comments(writer, partition):
+    # The writer's own comments show up even before they are written. Taken
+    # before the feed is read, so a comment written in between is in one or
+    # the other.
+    pending = ingest.comment_buffer.pending_for(writer) if writer else []
+    if partition is not None:
+        pending = [comment for comment in pending if comment.partition == partition]
+    return pending
+
+
+def _render_stored_basic(
+    request, comments, next_cursor, pending, new_writer, new_partition
+):
+    latest_cursor = pagination.encode_cursor(comments[0]) if comments else ""
+
+    context = registry.lab_context(
+        "stored_basic",
+        comments=ingest.merge_pending(comments, pending),
+        next_cursor=next_cursor,
+        latest_cursor=latest_cursor,
+    )
+    response = render(request, "labs/xss/stored_basic.html", context)
+    if new_writer:
+        ingest.set_writer(response, new_writer)
+    if new_partition:
+        partitions.remember(response, new_partition)
+    return response
+
+
+def stored_basic_older(request):
+    """
+    Older comments for the Basic Stored XSS lab, one page per request.
+    Returns an HTML fragment by default, or JSON with ?format=json.
+    """
+    partition, _ = partitions.resolve(request)
+    try:
+        comments, next_cursor = pagination.comment_page(
+            before=request.GET.get("before"), partition=partition
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    if request.GET.get("format") == "json":
+        return JsonResponse(
+            {"comments": _comment_dicts(comments), "next_cursor": next_cursor}
+        )
+
+    context = {"comments": comments, "next_cursor": next_cursor}
+    return render(request, "labs/xss/includes/comment_list.html", context)
+
+
+def _comments_etag(request):
+    # The newest comment identifies the state of the feed; the partition and
+    # query string identify what the client asked for. One index lookup, no
+    # rendering.
+    partition, _ = partitions.resolve(request)
+    state = (
+        f"{partition}:{pagination.latest_cursor(partition)}"
+        f"?{request.META.get('QUERY_STRING', '')}"
+    )
+    return hashlib.md5(state.encode(), usedforsecurity=False).hexdigest()
+
+
+@cache_control(no_cache=True)
+@condition(etag_func=_comments_etag)
+def stored_basic_since(request):
+    """
+    Comments posted after ?since=<cursor> for the Basic Stored XSS lab.
+    Pollers send If-None-Match and get a 304 while nothing has changed.
+    The new cursor is in the X-Comments-Cursor header (HTML) or the body.
+    """
+    partition, _ = partitions.resolve(request)
+    try:
+        comments, cursor = pagination.comments_since(
+            since=request.GET.get("since"), partition=partition
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
 
-    return render(request, "labs/xss/stored_basic.html", context)
+    if request.GET.get("format") == "json":
+        return JsonResponse({"comments": _comment_dicts(comments), "cursor": cursor})
 
+    context = {"comments": comments, "next_cursor": None}
+    response = render(request, "labs/xss/includes/comment_list.html", context)
+    response["X-Comments-Cursor"] = cursor
+    return response
 
+
+def _comment_dicts(comments):
+    return [
+        {
+            "id": comment.pk,
+            "name": comment.name,
+            "comment": comment.comment,
+            "date": comment.date.isoformat(),
+        }
+        for comment in comments
+    ]
+
+
+@cache_response
 def dom_basic(request):
-    context = {
-        "lab_title": "Simple DOM XSS",
-        "difficulty": "BEGINNER",
-        "lab_description": "Client-side XSS through DOM manipulation - vulnerability in JavaScript code.",
-        "next_lab_url": "/labs/xss/attribute/",
-        "hints": [
-            {
-                "title": "Client-Side Vulnerability",
-                "content": "JavaScript processes URL color parameter directly.",
-            },
-            {
-                "title": "URL Parameter",
-                "content": "Add ?color=red to URL - JavaScript uses parameter value.",
-            },
-            {
-                "title": "innerHTML Usage",
-                "content": "Color parameter inserted via innerHTML - try HTML tags.",
-            },
-            {
-                "title": "Solution",
-                "content": "Add this to the URL: ?color=<script>alert('XSS')</script>",
-            },
-        ],
-    }
+    context = registry.lab_context("dom_basic")
     return render(request, "labs/xss/dom_basic.html", context)
 
 
+@cache_response
 def attribute(request):
-    context = {
-        "lab_title": "HTML Attribute XSS",
-        "difficulty": "INTERMEDIATE",
-        "lab_description": "XSS in HTML attributes - break out of attribute context to inject event handlers.",
-        "next_lab_url": "/labs/xss/js-context/",
-        "hints": [
-            {
-                "title": "Attribute Context",
-                "content": "Input placed in HTML attributes (title, alt) - check generated HTML.",
-            },
-            {
-                "title": "Quote Escape",
-                "content": "Close attribute quote, then add new attributes.",
-            },
-            {
-                "title": "Event Handlers",
-                "content": "Add JavaScript events: onmouseover, onclick, onfocus.",
-            },
-            {
-                "title": "Solution",
-                "content": "Enter this in the title field: \" onmouseover=\"alert('XSS') - Then hover over the image to trigger the alert.",
-            },
-        ],
-        "success_message": "You successfully executed an HTML attribute XSS attack!",
-    }
+    context = registry.lab_context("attribute")
     return render(request, "labs/xss/attribute.html", context)
 
 
+@cache_response
 def js_context(request):
-    context = {
-        "lab_title": "JavaScript Context XSS",
-        "difficulty": "INTERMEDIATE",
-        "lab_description": "XSS in JavaScript context - break out of string literals to execute code.",
-        "next_lab_url": "/labs/xss/svg-xss/",
-        "hints": [
-            {
-                "title": "JavaScript Variables",
-                "content": "Input embedded in JavaScript variables - check page source.",
-            },
-            {
-                "title": "String Escape",
-                "content": "Close string quotes first, then add code.",
-            },
-            {
-                "title": "Comment Trick",
-                "content": "Use // to comment out remaining code and prevent errors.",
-            },
-            {
-                "title": "Solution",
-                "content": 'Enter this in the username or status field: "; alert(\'XSS\'); // - Then click "Show User Info" to trigger the JavaScript.',
-            },
-        ],
-        "success_message": "You successfully executed a JavaScript context XSS attack!",
-    }
+    context = registry.lab_context("js_context")
     return render(request, "labs/xss/js_context.html", context)
 
 
+@cache_response(csrf_cookie=True)
 def svg_xss(request):
-    context = {
-        "lab_title": "SVG XSS",
-        "difficulty": "INTERMEDIATE",
-        "lab_description": "SVG files with embedded JavaScript - XSS through vector graphics.",
-        "next_lab_url": "/labs/xss/markdown-xss/",
-        "hints": [
-            {
-                "title": "SVG Events",
-                "content": "SVG elements support onload, onclick, onmouseover events.",
-            },
-            {
-                "title": "SVG Scripts",
-                "content": "SVG supports <script> tags that execute JavaScript.",
-            },
-            {
-                "title": "Animation Events",
-                "content": "SVG animations can trigger events with <animate>.",
-            },
-            {
-                "title": "Solution",
-                "content": 'Try: <svg onload="alert(\'XSS\')"><rect width="100" height="100"/></svg>',
-            },
-        ],
-        "success_message": "You successfully executed an SVG XSS attack!",
-    }
+    context = registry.lab_context("svg_xss")
     return render(request, "labs/xss/svg_xss.html", context)
 
 
@@ -617,79 +270,24 @@ def markdown_xss(request):
     markdown_content = ""
     if request.method == "POST":
         markdown_content = request.POST.get("markdown", "")
-        # Basic markdown-like processing (intentionally vulnerable)
-        # Convert **text** to <strong>text</strong>
-        import re
-
-        markdown_content = re.sub(
-            r"\*\*(.*?)\*\*", r"<strong>\1</strong>", markdown_content
-        )
-        # Convert [text](url) to <a href="url">text</a> - vulnerable to javascript: URLs
-        markdown_content = re.sub(
-            r"\[(.*?)\]\((.*?)\)", r'<a href="\2">\1</a>', markdown_content
-        )
-
-    context = {
-        "lab_title": "Markdown XSS",
-        "difficulty": "INTERMEDIATE",
-        "lab_description": "Markdown parser with XSS vulnerabilities - raw HTML and JavaScript URLs allowed.",
-        "next_lab_url": "/labs/xss/websocket-xss/",
-        "hints": [
-            {
-                "title": "Markdown Links",
-                "content": "Markdown link syntax [text](url) can be exploited with javascript: URLs.",
-            },
-            {
-                "title": "HTML in Markdown",
-                "content": "Many markdown parsers allow raw HTML, which can be exploited for XSS.",
-            },
-            {
-                "title": "JavaScript URLs",
-                "content": "Try using javascript: protocol in markdown links.",
-            },
-            {
-                "title": "Solution",
-                "content": "Try: [Click me](javascript:alert('XSS'))",
-            },
-        ],
-        "markdown_content": markdown_content,
-        "success_message": "You successfully executed a Markdown XSS attack!",
-    }
-    return render(request, "labs/xss/markdown_xss.html", context)
+        # Basic markdown-like processing (intentionally vulnerable):
+        # **text** becomes <strong>text</strong> and [text](url) becomes
+        # <a href="url">text</a>, javascript: URLs included.
+        markdown_content = markdown.render(markdown_content)
 
+    context = registry.lab_context("markdown_xss", markdown_content=markdown_content)
     return render(request, "labs/xss/markdown_xss.html", context)
 
 
+@cache_response
 def websocket_xss(request):
     """
     View for the WebSocket XSS lab.
     Demonstrates XSS through WebSocket message handling.
     """
-    context = {
-        "lab_title": "WebSocket XSS",
-        "difficulty": "ADVANCED",
-        "lab_description": "Real-time XSS through WebSocket messages - client-side processing without sanitization.",
-        "next_lab_url": None,
-        "hints": [
-            {
-                "title": "WebSocket Messages",
-                "content": "WebSocket messages can contain user data that gets processed by JavaScript.",
-            },
-            {
-                "title": "Message Handling",
-                "content": "Look at how incoming WebSocket messages are processed and displayed.",
-            },
-            {
-                "title": "Real-time XSS",
-                "content": "XSS through WebSockets can affect multiple users in real-time.",
-            },
-            {
-                "title": "Solution",
-                "content": "Send a message containing: <script>alert('XSS')</script>",
-            },
-        ],
-        "success_message": "You successfully executed a WebSocket XSS attack!",
-    }
+    context = registry.lab_context(
+        "websocket_xss", websocket_path=websocket.WEBSOCKET_PATH
+    )
     return render(request, "labs/xss/websocket_xss.html", context)
 
 
@@ -698,6 +296,18 @@ def content_type(request):
     View for the Content-Type XSS lab.
     Demonstrates vulnerabilities related to improper Content-Type handling.
     """
+    return _content_type_response(request)
+
+
+async def content_type_async(request):
+    """
+    Async variant of content_type. It does no blocking work, so under ASGI
+    it runs on the event loop instead of being handed to a thread.
+    """
+    return _content_type_response(request)
+
+
+def _content_type_response(request):
 
     # Handle direct file serving
     if request.GET.get("direct") == "1" and request.GET.get("content"):
@@ -705,74 +315,55 @@ def content_type(request):
         filename = request.GET.get("filename", "untitled")
 
         # Vulnerable: Determining Content-Type by file extension only
-        content_type, _ = mimetypes.guess_type(filename)
+        content_type = mime.guess_type(filename)
         if not content_type:
             content_type = "text/plain"
 
-        response = HttpResponse(content, content_type=content_type)
-        response["Content-Disposition"] = f'inline; filename="{filename}"'
-        return response
+        return _direct_response(request, content, filename, content_type)
 
     # Detect content type for preview
     detected_content_type = "text/plain"
     if request.GET.get("filename"):
         filename = request.GET.get("filename")
-        content_type, _ = mimetypes.guess_type(filename)
+        content_type = mime.guess_type(filename)
         if content_type:
             detected_content_type = content_type
 
-    context = {
-        "lab_title": "Content-Type XSS",
-        "difficulty": "ADVANCED",
-        "lab_description": "MIME type confusion - browsers interpret content based on Content-Type headers.",
-        "next_lab_url": None,
-        "hints": [
-            {
-                "title": "MIME Type Confusion",
-                "content": "Browsers interpret content based on Content-Type headers.",
-            },
-            {
-                "title": "File Extension Spoofing",
-                "content": "Try using different file extensions to change content type.",
-            },
-            {
-                "title": "HTML Content Type",
-                "content": "Getting HTML content type allows script execution.",
-            },
-            {
-                "title": "Solution",
-                "content": "Upload content with .html extension containing script tags.",
-            },
-        ],
-        "detected_content_type": detected_content_type,
-        "success_message": "You successfully executed a Content-Type XSS attack!",
-    }
-
+    context = registry.lab_context(
+        "content_type", detected_content_type=detected_content_type
+    )
     return render(request, "labs/xss/content_type.html", context)
 
 
+# What direct serving returns depends only on the query string and on this
+# code, so it can't have changed since the process started.
+_SERVING_SINCE = int(time.time())
+_SERVING_SINCE_HTTP = http_date(_SERVING_SINCE)
+
+
+def _direct_response(request, content, filename, content_type):
+    # Length prefixes keep the parts from running into each other.
+    representation = f"{len(content_type)}:{content_type}{len(filename)}:{filename}"
+    digest = hashlib.md5(
+        (representation + content).encode(), usedforsecurity=False
+    ).hexdigest()
+    etag = quote_etag(digest)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=_SERVING_SINCE
+    )
+    if response is None:
+        response = HttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'inline; filename="{filename}"'
+    response["ETag"] = etag
+    response["Last-Modified"] = _SERVING_SINCE_HTTP
+    response["Cache-Control"] = f"public, max-age={settings.XSS_DIRECT_SERVE_MAX_AGE}"
+    return response
+
+
+@cache_response
 def ajax_json(request):
-    context = {
-        "lab_title": "AJAX/JSON XSS",
-        "difficulty": "INTERMEDIATE",
-        "lab_description": "AJAX responses with user data processed by innerHTML - client-side XSS vulnerability.",
-        "next_lab_url": "/labs/xss/filter-bypass/",
-        "hints": [
-            {
-                "title": "JSON Response",
-                "content": "Look at the JavaScript code below. The search query is reflected in the JSON response.",
-            },
-            {
-                "title": "innerHTML Usage",
-                "content": "The client-side code uses innerHTML to display the search results, which can execute HTML/JavaScript.",
-            },
-            {
-                "title": "Solution",
-                "content": "Try searching for: <img src=x onerror=alert('XSS')>",
-            },
-        ],
-        "success_message": "You successfully executed an AJAX/JSON XSS attack!",
-    }
+    context = registry.lab_context("ajax_json")
     return render(request, "labs/xss/ajax_json.html", context)
 
 
@@ -786,98 +377,106 @@ def filter_bypass(request):
 
     if request.method == "POST" and request.POST.get("comment"):
         comment = request.POST.get("comment")
-        filtered_comment = comment
-
-        # Basic XSS filters (intentionally bypassable)
-        filters = [
-            ("<script>", ""),
-            ("</script>", ""),
-            ("javascript:", ""),
-            ("onclick", ""),
-            ("onload", ""),
-            ("onerror", ""),
-            ("alert()", ""),
-            ("eval()", ""),
-            ("document.cookie", ""),
-        ]
-
-        for pattern, replacement in filters:
-            if pattern in filtered_comment:
-                blocked_patterns.append(pattern)
-                filtered_comment = filtered_comment.replace(pattern, replacement)
-
-    context = {
-        "lab_title": "Filter Bypass XSS",
-        "difficulty": "ADVANCED",
-        "lab_description": "Basic XSS filters with common bypass techniques - case sensitivity and alternative tags.",
-        "next_lab_url": "/labs/xss/dom-clobbering/",
-        "hints": [
-            {
-                "title": "Case Sensitivity",
-                "content": "Try different cases like <ScRiPt> instead of <script>.",
-            },
-            {
-                "title": "Alternative Tags",
-                "content": "Use other HTML tags like <img>, <svg>, or <iframe> with event handlers.",
-            },
-            {
-                "title": "Encoding Bypass",
-                "content": "Try URL encoding, HTML entities, or other encoding methods.",
-            },
-            {
-                "title": "Solution",
-                "content": "Try: <img src=x onerror=alert('XSS')> or <ScRiPt>alert('XSS')</ScRiPt>",
-            },
-        ],
-        "filtered_comment": filtered_comment,
-        "blocked_patterns": blocked_patterns,
-        "success_message": "You successfully bypassed the XSS filters!",
-    }
+        # Basic XSS filters (intentionally bypassable), from labs.yaml
+        filtered_comment, blocked_patterns = filters.apply_filters(
+            "filter_bypass", comment
+        )
 
+    context = registry.lab_context(
+        "filter_bypass",
+        filtered_comment=filtered_comment,
+        blocked_patterns=blocked_patterns,
+    )
     return render(request, "labs/xss/filter_bypass.html", context)
 
 
+@csrf_exempt
 def file_upload_xss(request):
     """
     View for the File Upload XSS lab.
     Demonstrates XSS through file upload functionality.
     """
-    uploaded_content = ""
-    if request.method == "POST" and request.FILES.get("file"):
-        uploaded_file = request.FILES["file"]
-        try:
-            uploaded_content = uploaded_file.read().decode("utf-8")
-        except Exception:
-            uploaded_content = "Could not read file content"
-
-    context = {
-        "lab_title": "File Upload XSS",
-        "difficulty": "ADVANCED",
-        "lab_description": "File upload with content display - uploaded files rendered as HTML without sanitization.",
-        "next_lab_url": None,  # Last lab in the series
-        "uploaded_content": uploaded_content,
-        "hints": [
-            {
-                "title": "File Content Processing",
-                "content": "Uploaded files are read and their content is displayed directly on the page without any sanitization or filtering.",
-            },
-            {
-                "title": "HTML File Upload",
-                "content": "Try uploading an HTML file containing JavaScript code. The file content will be rendered as HTML in the browser.",
-            },
-            {
-                "title": "Script Execution Context",
-                "content": "When the file content is displayed using innerHTML, any JavaScript within it will execute in the current page context.",
-            },
-            {
-                "title": "File Types",
-                "content": "You can upload files with extensions like .html, .txt, or even .js - the content is what matters, not the extension.",
-            },
-            {
-                "title": "Solution",
-                "content": "Create a file with content: <script>alert('File Upload XSS!')</script> and upload it. The script will execute when the content is displayed.",
-            },
-        ],
-        "success_message": "You successfully executed a File Upload XSS attack!",
+    # The size cap has to be in place before the CSRF check parses the body
+    size_cap = uploads.cap_upload_size(request)
+    return _file_upload_xss(request, size_cap)
+
+
+@csrf_exempt
+async def file_upload_xss_async(request):
+    """
+    Async variant of file_upload_xss. Parsing the body and decoding the
+    spooled file are blocking file I/O, so they run in a thread.
+    """
+    size_cap = uploads.cap_upload_size(request)
+    return await sync_to_async(_file_upload_xss)(request, size_cap)
+
+
+@csrf_protect
+def _file_upload_xss(request, size_cap):
+    upload = {}
+    if request.method == "POST":
+        upload = _process_upload(request, size_cap)
+
+    context = registry.lab_context("file_upload_xss", **upload)
+    status = 413 if size_cap.exceeded else 200
+    return render(request, "labs/xss/file_upload_xss.html", context, status=status)
+
+
+def _process_upload(request, size_cap):
+    uploaded_file = request.FILES.get("file")
+    if size_cap.exceeded:
+        return {"upload_too_large": True, "upload_limit": size_cap.max_size}
+    if not uploaded_file:
+        return {}
+
+    digest, created = uploads.store.save(uploaded_file)
+    upload = {
+        "upload_digest": digest,
+        "upload_deduplicated": not created,
+        "upload_size": uploaded_file.size,
     }
-    return render(request, "labs/xss/file_upload_xss.html", context)
+    preview = uploads.store.preview(digest)
+    if preview is None:
+        return {**upload, "uploaded_content": "Could not read file content"}
+    upload["uploaded_content"], upload["upload_truncated"] = preview
+    return upload
+
+
+def stored_upload(request, digest):
+    """
+    A file stored by the File Upload XSS lab, as plain text. The URL names
+    the content, so it can be cached forever; supports ranges and 304s.
+    """
+    try:
+        return file_response(
+            request,
+            uploads.store.path(digest),
+            etag=digest,
+            content_type="text/plain; charset=utf-8",
+            headers={"Cache-Control": "public, max-age=31536000, immutable"},
+        )
+    except (ValueError, FileNotFoundError) as exc:
+        raise Http404("No such upload.") from exc
+
+
+def detector_stats(request):
+    """
+    Debug endpoint exposing the XSS detector's per-check counters.
+    Only available with DEBUG on; counters are per worker process.
+    """
+    if not settings.DEBUG:
+        raise Http404("Detector statistics are only available with DEBUG on.")
+
+    mode = request.GET.get("mode", detection.MODE_INSTRUMENTED)
+    try:
+        checks = detection.detector_stats(mode)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    return JsonResponse(
+        {
+            "mode": mode,
+            "checks": checks,
+            "verdict_cache": detection.verdict_cache.info(),
+        }
+    )
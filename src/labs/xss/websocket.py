@@ -0,0 +1,183 @@
+"""
+WebSocket chat backend for the WebSocket XSS lab.
+
+A plain ASGI application (core.asgi routes WEBSOCKET_PATH here) that fans
+every message out to everyone in the same room. Rooms live in the serving
+process, so run a single ASGI worker.
+
+Each connection has a bounded send queue drained by its own task, so one
+slow browser can't hold up a broadcast. When a queue is full the
+XSS_WEBSOCKET_SLOW_CONSUMER policy applies: "drop" discards that
+connection's oldest queued message, "disconnect" closes it. Each room also
+keeps its last XSS_WEBSOCKET_HISTORY messages in a ring buffer that is
+replayed to late joiners.
+
+Messages are relayed as-is: rendering them unescaped is the lab's
+vulnerability, and it lives in the browser.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from urllib.parse import parse_qs
+
+from django.conf import settings
+
+WEBSOCKET_PATH = "/labs/xss/websocket-xss/ws/"
+
+SLOW_CONSUMER_DROP = "drop"
+SLOW_CONSUMER_DISCONNECT = "disconnect"
+
+# RFC 6455 "Try Again Later", sent to consumers that can't keep up.
+CLOSE_TRY_AGAIN_LATER = 1013
+CLOSE_MESSAGE_TOO_BIG = 1009
+
+MAX_MESSAGE_LENGTH = 4096
+MAX_NAME_LENGTH = 64
+
+
+class Connection:
+    def __init__(self, send, queue_size, slow_consumer):
+        self.send = send
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.slow_consumer = slow_consumer
+        self.dropped = 0
+        self.closing = False
+
+    def offer(self, text):
+        """Queue ``text`` without waiting, applying the slow-consumer policy."""
+        if self.closing:
+            return
+        try:
+            self.queue.put_nowait(text)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.slow_consumer == SLOW_CONSUMER_DISCONNECT:
+            self.closing = True
+            # Wake the sender so it sees the flag and closes.
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+        else:
+            self.queue.get_nowait()
+            self.queue.put_nowait(text)
+            self.dropped += 1
+
+    async def run_sender(self, backlog):
+        for text in backlog:
+            await self.send({"type": "websocket.send", "text": text})
+        while True:
+            text = await self.queue.get()
+            if self.closing:
+                await self.send(
+                    {"type": "websocket.close", "code": CLOSE_TRY_AGAIN_LATER}
+                )
+                return
+            await self.send({"type": "websocket.send", "text": text})
+
+
+class Room:
+    def __init__(self, name, history):
+        self.name = name
+        self.connections = set()
+        self.history = deque(maxlen=history)
+
+    def publish(self, text):
+        self.history.append(text)
+        for connection in self.connections:
+            connection.offer(text)
+
+
+class Hub:
+    """Rooms of the serving process, created on first join."""
+
+    def __init__(self):
+        self.rooms = {}
+
+    def join(self, name, connection):
+        """Add ``connection`` to a room; return the history to replay."""
+        room = self.rooms.get(name)
+        if room is None:
+            room = self.rooms[name] = Room(name, settings.XSS_WEBSOCKET_HISTORY)
+        room.connections.add(connection)
+        return list(room.history)
+
+    def leave(self, name, connection):
+        room = self.rooms.get(name)
+        if room is None:
+            return
+        room.connections.discard(connection)
+        # History is for late joiners; once everyone has left it goes too,
+        # so client-chosen room names can't pile up.
+        if not room.connections:
+            del self.rooms[name]
+
+    def broadcast(self, name, user, content):
+        message = {
+            "type": "message",
+            "room": name,
+            "user": user,
+            "content": content,
+            "ts": time.time(),
+        }
+        # Serialised once, however many connections receive it.
+        self.rooms[name].publish(json.dumps(message))
+
+
+hub = Hub()
+
+
+def _parse(text):
+    """Return (user, content) from a JSON or plain-text client message."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        return str(data.get("user") or "anonymous"), str(data.get("content", ""))
+    return "anonymous", text
+
+
+async def websocket_application(scope, receive, send):
+    event = await receive()
+    if event["type"] != "websocket.connect":
+        return
+    await send({"type": "websocket.accept"})
+
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    room = query.get("room", ["lobby"])[0][:MAX_NAME_LENGTH] or "lobby"
+
+    connection = Connection(
+        send, settings.XSS_WEBSOCKET_QUEUE_SIZE, settings.XSS_WEBSOCKET_SLOW_CONSUMER
+    )
+    sender = asyncio.create_task(connection.run_sender(hub.join(room, connection)))
+    try:
+        while True:
+            receiving = asyncio.ensure_future(receive())
+            done, _ = await asyncio.wait(
+                {receiving, sender}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if sender in done:
+                # Closed as a slow consumer, or sending failed because the
+                # client went away.
+                receiving.cancel()
+                sender.exception()
+                break
+            event = receiving.result()
+            if event["type"] == "websocket.disconnect":
+                break
+
+            text = event.get("text")
+            if text is None:
+                text = (event.get("bytes") or b"").decode("utf-8", "replace")
+            if len(text) > MAX_MESSAGE_LENGTH:
+                connection.closing = True
+                await send({"type": "websocket.close", "code": CLOSE_MESSAGE_TOO_BIG})
+                break
+            user, content = _parse(text)
+            hub.broadcast(room, user[:MAX_NAME_LENGTH], content)
+    finally:
+        hub.leave(room, connection)
+        sender.cancel()
@@ -26,6 +26,7 @@ function setupHintToggle() {
     const hintsSection = document.getElementById('hintsSection');
 
     if (hintToggle && hintsSection) {
+        const hintLabel = hintToggle.querySelector('span');
         let hintsVisible = false;
 
         hintToggle.addEventListener('click', function () {
@@ -42,7 +43,7 @@ function setupHintToggle() {
                     hintsSection.style.transform = 'translateY(0)';
                 }, 50);
 
-                hintToggle.innerHTML = '<i data-lucide="lightbulb" class="h-4 w-4 mr-2 inline group-hover:animate-pulse"></i><span class="font-medium">Hide Hints</span>';
+                hintLabel.textContent = 'Hide Hints';
             } else {
                 hintsSection.style.opacity = '0';
                 hintsSection.style.transform = 'translateY(-10px)';
@@ -51,18 +52,29 @@ function setupHintToggle() {
                     hintsSection.style.display = 'none';
                 }, 300);
 
-                hintToggle.innerHTML = '<i data-lucide="lightbulb" class="h-4 w-4 mr-2 inline group-hover:animate-pulse"></i><span class="font-medium">Show Hints</span>';
-            }
-
-            // Refresh Lucide icons
-            if (window.lucide) {
-                lucide.createIcons();
+                hintLabel.textContent = 'Show Hints';
             }
         });
     }
 }
 
+// Cached lab pages can't embed a per-user CSRF token, so their forms carry an
+// empty csrfmiddlewaretoken field that is filled from the CSRF cookie.
+function fillCsrfTokens() {
+    const match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+    if (!match) {
+        return;
+    }
+
+    document.querySelectorAll('input[name="csrfmiddlewaretoken"]').forEach(input => {
+        if (!input.value) {
+            input.value = decodeURIComponent(match[1]);
+        }
+    });
+}
+
 // Initialize common functionality when DOM is loaded
 document.addEventListener('DOMContentLoaded', function () {
     setupHintToggle();
+    fillCsrfTokens();
 });
\ No newline at end of file
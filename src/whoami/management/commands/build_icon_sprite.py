@@ -0,0 +1,94 @@
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+
+from whoami.templatetags.icons import SPRITE_FILE, load_sprite
+
+# Icon names passed as string literals to {% icon %}.
+_ICON_TAG = re.compile(r"""{%\s*icon\s+["']([a-z0-9-]+)["']""")
+_SVG_BODY = re.compile(r"<svg\b[^>]*>(.*)</svg>", re.DOTALL)
+_VIEW_BOX = re.compile(r'viewBox="([^"]+)"')
+
+HEADER = """\
+<!--
+  Lucide icons (https://lucide.dev), ISC License.
+  Copyright (c) for portions of Lucide are held by Cole Bemis 2013-2022 as
+  part of Feather (MIT). All other copyright (c) for Lucide are held by
+  Lucide Contributors 2022.
+  Permission to use, copy, modify, and/or distribute this software for any
+  purpose with or without fee is hereby granted, provided that the above
+  copyright notice and this permission notice appear in all copies.
+  Generated by manage.py build_icon_sprite; only the icons the site uses.
+-->
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenerate the icon sprite read by the {% icon %} tag from a "
+        "directory of Lucide SVGs (e.g. the icons/ folder of lucide-static). "
+        "The sprite keeps the icons it has and adds every icon named in a "
+        "template."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Directory of Lucide <name>.svg files.")
+        parser.add_argument(
+            "--icon",
+            action="append",
+            default=[],
+            help="Also include this icon, e.g. one named in data (repeatable).",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Drop icons that no template names and --icon doesn't list.",
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options["source"])
+        names = self._template_icons() | set(options["icon"])
+        if not options["prune"] and SPRITE_FILE.exists():
+            names |= set(load_sprite())
+
+        symbols = []
+        for name in sorted(names):
+            path = source / f"{name}.svg"
+            if not path.exists():
+                raise CommandError(f"No {path.name} in {source}")
+            svg = path.read_text(encoding="utf-8")
+            body = _SVG_BODY.search(svg)[1]
+            lines = "\n".join(
+                f"    {line.strip()}" for line in body.strip().splitlines()
+            )
+            view_box = _VIEW_BOX.search(svg)[1]
+            symbols.append(
+                f'  <symbol id="{name}" viewBox="{view_box}">\n{lines}\n  </symbol>\n'
+            )
+
+        SPRITE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        SPRITE_FILE.write_text(
+            HEADER
+            + '<svg xmlns="http://www.w3.org/2000/svg">\n'
+            + "".join(symbols)
+            + "</svg>\n",
+            encoding="utf-8",
+        )
+        load_sprite.cache_clear()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(symbols)} icons to "
+                f"{SPRITE_FILE.relative_to(settings.BASE_DIR)}."
+            )
+        )
+
+    def _template_icons(self):
+        names = set()
+        for engine in engines.all():
+            for directory in engine.template_dirs:
+                for path in Path(directory).rglob("*.html"):
+                    names.update(_ICON_TAG.findall(path.read_text(encoding="utf-8")))
+        return names
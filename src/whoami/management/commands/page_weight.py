@@ -0,0 +1,120 @@
+import gzip
+from html.parser import HTMLParser
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+PATHS = ("/", "/labs/", "/guides/")
+
+MODES = {"built": False, "cdn": True}
+
+
+class _BlockingResources(HTMLParser):
+    """Collect the stylesheets and scripts that hold up the first paint."""
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+        self._in_head = True
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "body":
+            self._in_head = False
+        elif tag == "link" and attrs.get("rel") == "stylesheet":
+            self.urls.append(attrs["href"])
+        elif (
+            tag == "script"
+            and self._in_head
+            and attrs.get("src")
+            and not {"async", "defer"} & attrs.keys()
+            and attrs.get("type") != "module"
+        ):
+            self.urls.append(attrs["src"])
+
+
+def _fetch(url):
+    """Return the bytes behind ``url``, or None if they can't be had."""
+    if url.startswith(settings.STATIC_URL):
+        name = url.removeprefix(settings.STATIC_URL).split("?")[0]
+        # Hashed names only exist once collected.
+        path = finders.find(name)
+        if path is None and staticfiles_storage.exists(name):
+            path = staticfiles_storage.path(name)
+        if path is None:
+            return None
+        with open(path, "rb") as static_file:
+            return static_file.read()
+    try:
+        with urlopen(url, timeout=10) as response:
+            return response.read()
+    except (URLError, OSError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the weight of pages styled by the built Tailwind stylesheet "
+        "with the same pages compiling their styles in the browser from the "
+        "Tailwind CDN: the HTML, and the stylesheets and scripts the browser "
+        "has to fetch before the first paint, raw and gzipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            help=f"Page to weigh (repeatable, default: {', '.join(PATHS)}).",
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        cache = {}
+        unreachable = set()
+
+        self.stdout.write(
+            f"{'page':<12} {'mode':<6} {'html':>8} {'blocking':>9} "
+            f"{'bytes':>9} {'gzipped':>9}  styled by"
+        )
+        for path in options["path"] or PATHS:
+            for mode, cdn in MODES.items():
+                # Cached pages are keyed by path alone: they would answer
+                # both modes with the one rendered first.
+                with override_settings(TAILWIND_CDN=cdn, RESPONSE_CACHE_ENABLED=False):
+                    response = client.get(path)
+                if response.status_code != 200:
+                    raise CommandError(f"{path} answered {response.status_code}.")
+                parser = _BlockingResources()
+                parser.feed(response.content.decode())
+
+                size = gzipped = 0
+                for url in parser.urls:
+                    if url not in cache:
+                        cache[url] = _fetch(url)
+                    body = cache[url]
+                    if body is None:
+                        unreachable.add(url)
+                        continue
+                    size += len(body)
+                    gzipped += len(gzip.compress(body))
+
+                styled_by = "script, in the browser" if cdn else "stylesheet"
+                self.stdout.write(
+                    f"{path:<12} {mode:<6} {len(response.content):>8} "
+                    f"{len(parser.urls):>9} {size:>9} {gzipped:>9}  {styled_by}"
+                )
+
+        if unreachable:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Left out of the figures, unreachable: "
+                    f"{', '.join(sorted(unreachable))}"
+                )
+            )
+        self.stdout.write(self.style.SUCCESS("Weighed every page in both modes."))
@@ -0,0 +1,64 @@
+"""
+Lucide icons, rendered on the server.
+
+``{% icon "shield" "h-6 w-6 text-white" %}`` inlines the icon as an
+``<svg>`` with the same attributes lucide.createIcons() would give it, so
+pages need no icon JavaScript. Icons come from the sprite vendored at
+static/icons/lucide.svg, which holds only the icons the site uses;
+``manage.py build_icon_sprite`` regenerates it.
+"""
+
+import re
+from functools import cache, lru_cache
+
+from django import template
+from django.conf import settings
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SPRITE_FILE = settings.BASE_DIR / "static" / "icons" / "lucide.svg"
+
+_SYMBOL = re.compile(
+    r'<symbol id="(?P<name>[a-z0-9-]+)" viewBox="(?P<view_box>[^"]+)">'
+    r"(?P<body>.*?)</symbol>",
+    re.DOTALL,
+)
+
+register = template.Library()
+
+
+@cache
+def load_sprite(path=SPRITE_FILE):
+    """Return ``{name: (view_box, body)}`` for the symbols in the sprite."""
+    with open(path, encoding="utf-8") as sprite:
+        return {
+            match["name"]: (
+                match["view_box"],
+                "".join(line.strip() for line in match["body"].splitlines()),
+            )
+            for match in _SYMBOL.finditer(sprite.read())
+        }
+
+
+@lru_cache(maxsize=512)
+def render_icon(name, css_class=""):
+    try:
+        view_box, body = load_sprite()[name]
+    except KeyError:
+        raise template.TemplateSyntaxError(
+            f"Unknown icon {name!r}: add it to {SPRITE_FILE.name} with "
+            f"build_icon_sprite."
+        ) from None
+    classes = f"lucide lucide-{name} {css_class}".strip()
+    return mark_safe(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" '
+        f'viewBox="{view_box}" fill="none" stroke="currentColor" '
+        'stroke-width="2" stroke-linecap="round" stroke-linejoin="round" '
+        f'class="{escape(classes)}" aria-hidden="true">{body}</svg>'
+    )
+
+
+@register.simple_tag
+def icon(name, *classes):
+    """Inline the icon ``name``, with ``classes`` added to its class list."""
+    return render_icon(str(name), " ".join(str(css) for css in classes if css))
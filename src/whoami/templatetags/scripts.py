@@ -0,0 +1,107 @@
+"""
+Inline scripts that collectstatic turns into cacheable static files.
+
+``{% script %}<script>...</script>{% endscript %}`` wraps a page's own
+JavaScript. collectstatic writes it, minified with rjsmin, to
+``bundles/<template name>.js`` (see core.staticfiles), where it gets a
+hashed name and a gzip variant like any other static file. Pages then link
+the bundle instead of sending the code with every response. The script
+stays inline in development, and wherever the collected bundle doesn't
+match the template (it was edited after collectstatic ran), so a stale
+bundle is never served.
+
+The script can't contain template tags or variables: it must be the same
+for every request. Pass values through data attributes instead, and leave
+scripts that have to be rendered per request (such as a lab's vulnerable
+sink) outside the tag.
+"""
+
+import re
+from pathlib import Path
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.template import engines
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from rjsmin import jsmin
+
+_SCRIPT_ELEMENT = re.compile(r"\s*<script>(?P<code>.*)</script>\s*", re.DOTALL)
+_SCRIPT_TAG = re.compile(r"{%\s*script\s*%}")
+
+register = template.Library()
+
+
+class ScriptNode(template.Node):
+    def __init__(self, bundle_name, inline, code):
+        self.bundle_name = bundle_name
+        self.inline = inline
+        self.code = code
+        self._src = None
+
+    def render(self, context):
+        if settings.DEBUG:
+            return self.inline
+        if self._src is None:
+            self._src = self._bundle_url()
+        if not self._src:
+            return self.inline
+        return format_html('<script src="{}"></script>', self._src)
+
+    def _bundle_url(self):
+        """The URL of the collected bundle, or "" if it isn't this script."""
+        hashed_files = getattr(staticfiles_storage, "hashed_files", {})
+        collected = self.bundle_name and hashed_files.get(self.bundle_name)
+        if not collected:
+            return ""
+        expected = staticfiles_storage.hashed_name(
+            self.bundle_name, ContentFile(self.code.encode())
+        )
+        if collected != expected:
+            return ""
+        return staticfiles_storage.url(self.bundle_name)
+
+
+@register.tag
+def script(parser, token):
+    """Serve the enclosed ``<script>`` element as a static file; see above."""
+    nodelist = parser.parse(("endscript",))
+    parser.delete_first_token()
+    if any(not isinstance(node, template.base.TextNode) for node in nodelist):
+        raise template.TemplateSyntaxError(
+            "{% script %} can't contain template tags or variables."
+        )
+    inline = "".join(node.s for node in nodelist)
+    match = _SCRIPT_ELEMENT.fullmatch(inline)
+    if match is None:
+        raise template.TemplateSyntaxError(
+            "{% script %} must hold a single <script> element without attributes."
+        )
+
+    # Templates built from strings have no name to give a bundle, and stay
+    # inline.
+    bundle_name = None
+    if parser.origin.template_name:
+        name = Path(parser.origin.template_name).with_suffix("").as_posix()
+        count = parser.extra_data["script_count"] = (
+            parser.extra_data.get("script_count", 0) + 1
+        )
+        if count > 1:
+            name = f"{name}.{count}"
+        bundle_name = f"bundles/{name}.js"
+    return ScriptNode(bundle_name, mark_safe(inline.strip()), jsmin(match["code"]))
+
+
+def bundles():
+    """Yield ``(name, code)`` for every {% script %} in the templates."""
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            for path in sorted(Path(directory).rglob("*.html")):
+                if not _SCRIPT_TAG.search(path.read_text(encoding="utf-8")):
+                    continue
+                name = path.relative_to(directory).as_posix()
+                nodelist = engine.get_template(name).template.nodelist
+                for node in nodelist.get_nodes_by_type(ScriptNode):
+                    yield node.bundle_name, node.code
@@ -0,0 +1,20 @@
+"""
+The site stylesheet.
+
+``{% tailwind_stylesheet %}`` links the Tailwind CSS that ``manage.py
+tailwind build`` compiled from the templates and serves through staticfiles,
+or, with the TAILWIND_CDN setting on, loads the in-browser compiler from
+cdn.tailwindcss.com instead, the way the site used to.
+"""
+
+from django import template
+from django.conf import settings
+
+CDN_SCRIPT = "https://cdn.tailwindcss.com"
+
+register = template.Library()
+
+
+@register.inclusion_tag("tailwind.html")
+def tailwind_stylesheet():
+    return {"cdn_script": CDN_SCRIPT if settings.TAILWIND_CDN else None}
@@ -0,0 +1,93 @@
+import gzip
+import tempfile
+from pathlib import Path
+
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+
+from core.response_cache import accepts_gzip, response_cache
+
+
+class AcceptsGzipTests(SimpleTestCase):
+    def test_accepts_gzip(self):
+        cases = {
+            "": False,
+            "gzip": True,
+            "gzip, deflate, br": True,
+            "GZIP": True,
+            "x-gzip": True,
+            "*": True,
+            "br": False,
+            "gzip;q=0": False,
+            "gzip; q=0.0, br": False,
+            "gzip;q=0.5": True,
+            "gzip;q=0, *": False,
+            "br, *;q=0": False,
+            "gzip;q=nonsense": False,
+        }
+        factory = RequestFactory()
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                request = factory.get("/", headers={"accept-encoding": header})
+                self.assertIs(accepts_gzip(request), expected)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class CachedPageEncodingTests(TestCase):
+    databases = frozenset({"default", "labs"})
+
+    def setUp(self):
+        response_cache.clear()
+        self.addCleanup(response_cache.clear)
+
+    def test_gzip_refused_with_zero_qvalue(self):
+        self.client.get("/")
+        response = self.client.get("/", headers={"accept-encoding": "gzip;q=0"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response)
+
+        response = self.client.get("/", headers={"accept-encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+
+class UncollectedStaticFilesTests(TestCase):
+    databases = frozenset({"default", "labs"})
+
+    def test_pages_render_before_collectstatic(self):
+        with (
+            tempfile.TemporaryDirectory() as static_root,
+            override_settings(DEBUG=False, STATIC_ROOT=static_root),
+        ):
+            for path in ("/", "/labs/", "/guides/"):
+                with self.subTest(path=path):
+                    response = self.client.get(path)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertContains(response, "/static/css/tailwind.css")
+
+
+class StaticFilesEncodingTests(SimpleTestCase):
+    def test_gzip_refused_with_zero_qvalue(self):
+        content = b"console.log('static');\n" * 50
+        with tempfile.TemporaryDirectory() as static_root:
+            path = Path(static_root, "js", "app.js")
+            path.parent.mkdir()
+            path.write_bytes(content)
+            path.with_name("app.js.gz").write_bytes(gzip.compress(content))
+            with override_settings(SERVE_STATIC=True, STATIC_ROOT=static_root):
+                client = Client()
+                response = client.get(
+                    "/static/js/app.js", headers={"accept-encoding": "gzip;q=0"}
+                )
+                self.assertNotIn("Content-Encoding", response)
+                self.assertEqual(b"".join(response.streaming_content), content)
+
+                response = client.get(
+                    "/static/js/app.js", headers={"accept-encoding": "gzip"}
+                )
+                self.assertEqual(response["Content-Encoding"], "gzip")
+                response.close()
@@ -1,13 +1,18 @@
 from django.shortcuts import render
 
+from core.response_cache import cache_response
 
+
+@cache_response
 def index(request):
     return render(request, "whoami/index.html")
 
 
+@cache_response
 def labs(request):
     return render(request, "whoami/labs.html")
 
 
+@cache_response
 def guide(request):
     return render(request, "whoami/guide.html")